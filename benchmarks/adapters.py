@@ -0,0 +1,126 @@
+# Each adapter runs in a fresh worker whose working directory and import path
+# are the algorithm's own directory. It builds the instance and returns a
+# zero-argument `solve`, which the harness times on its own; `solve` returns
+# the run's status, cost, quality (lower is better), the quality metric's
+# name and the numbers of evaluations and iterations. An
+# `instrumentation.Instrumentation`, when given, is passed to the solver.
+
+
+def _tsp_quality(problem, length):
+    if problem.best_sol is not None:
+        return float(problem.GAP(length)), "gap"
+    return float(problem.BoundGAP(length)), "bound_gap"
+
+
+def _tsp(instance, params, generator, check_every, instrumentation):
+    from Problem import ProblemInstance
+    from cache import DEFAULT_CACHE_DIR
+    from anytime import Budget, run_anytime
+
+    params = dict(params)
+    problem = ProblemInstance(instance, distance_mode=params.pop("distance_mode", "matrix"),
+                              cache_dir=DEFAULT_CACHE_DIR)
+    time_limit = params.pop("time_limit", None)
+    budget = Budget(time_limit, params.pop("max_iter", 10000), params.pop("max_evals", None),
+                    check_every=check_every)
+    # build the lazy neighbour structures outside the timed region
+    problem.spatial_index
+
+    def solve():
+        best, iterations, evaluations = run_anytime(
+            generator(problem, budget, instrumentation=instrumentation, **params))
+        quality, metric = _tsp_quality(problem, best.length)
+        stopped = time_limit is not None and budget.elapsed() >= time_limit
+        return {"status": "time_limit" if stopped else "ok", "cost": best.length,
+                "quality": quality, "metric": metric, "evaluations": evaluations,
+                "iterations": iterations}
+    return solve
+
+
+def hill_climbing(instance, params, instrumentation=None):
+    from hill_climbing import hill_climb_anytime
+    return _tsp(instance, params, hill_climb_anytime, 1, instrumentation)
+
+
+def simulated_annealing(instance, params, instrumentation=None):
+    from simulated_annealing import simulated_annealing_anytime
+    return _tsp(instance, params, simulated_annealing_anytime, 64, instrumentation)
+
+
+def lin_kernighan(instance, params, instrumentation=None):
+    from lin_kernighan import lin_kernighan_anytime
+    return _tsp(instance, params, lin_kernighan_anytime, 64, instrumentation)
+
+
+def _path_result(path, cost, counters):
+    return {"status": "ok" if path else "timeout" if counters["timeout"] else "failed",
+            "cost": cost, "quality": cost, "metric": "path_cost",
+            "evaluations": counters["expanded"], "iterations": counters["iterations"] or None}
+
+
+def _frozen_lake(instance, params, instrumentation, is_slippery):
+    from instrumentation import Instrumentation
+    from maps import LakeMap, generate_map
+
+    params = dict(params)
+    is_slippery = params.pop("is_slippery", is_slippery)
+    if str(instance).endswith(".npy"):
+        lake_map = LakeMap.load(instance, is_slippery)
+    else:
+        lake_map = generate_map(int(instance), params.pop("p", 0.8), is_slippery)
+    # the searches run on the compiled map; compile it outside the timed region
+    lake = lake_map.compile()
+    lake.tables()
+    # node counts are the searches' evaluations, so they are always counted
+    counted = instrumentation if instrumentation is not None else Instrumentation(timers=False)
+    return lake, params, counted
+
+
+def branch_and_bound(instance, params, instrumentation=None):
+    import bnb
+
+    lake, params, counted = _frozen_lake(instance, params, instrumentation, is_slippery=True)
+
+    def solve():
+        path, cost = bnb.branch_and_bound(lake, instrumentation=counted, **params)
+        return _path_result(path, cost, counted.counters)
+    return solve
+
+
+def ida_star(instance, params, instrumentation=None):
+    import ida
+
+    lake, params, counted = _frozen_lake(instance, params, instrumentation, is_slippery=False)
+
+    def solve():
+        path, cost, _ = ida.ida_star(lake, instrumentation=counted, **params)
+        return _path_result(path, cost, counted.counters)
+    return solve
+
+
+def mdp_planning(instance, params, instrumentation=None):
+    import bnb
+    from mdp import compile_mdp
+
+    lake, params, counted = _frozen_lake(instance, params, instrumentation, is_slippery=True)
+    # the transition tensor is built outside the timed region, like the searches' tables
+    mdp = compile_mdp(lake)
+
+    def solve():
+        _, success = bnb.plan(mdp, instrumentation=counted, **params)
+        # lower is better in Cost as in every other adapter, so report the failure probability
+        return {"status": "ok", "cost": 1 - success, "quality": 1 - success,
+                "metric": "failure_probability", "evaluations": counted.counters["work"],
+                "iterations": None}
+    return solve
+
+
+# algorithm name -> (directory relative to the repository root, adapter)
+ADAPTERS = {
+    "hill_climbing": ("tsp/Hill Climbing", hill_climbing),
+    "simulated_annealing": ("tsp/Simulated_Annealing", simulated_annealing),
+    "lin_kernighan": ("tsp/Hill Climbing", lin_kernighan),
+    "branch_and_bound": ("frozen_lake/BNB", branch_and_bound),
+    "ida_star": ("frozen_lake/IDA", ida_star),
+    "mdp_planning": ("frozen_lake/BNB", mdp_planning),
+}
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import traceback
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from adapters import ADAPTERS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLUMNS = ["Suite", "Algorithm", "Instance", "Seed", "Params", "Status", "WallTime", "Evaluations",
+           "EvalsPerSec", "Iterations", "Cost", "Quality", "Metric", "SetupRSSMB", "PeakRSSMB",
+           "Trace", "Error", "Commit", "Host", "Python", "Timestamp"]
+
+
+def peak_rss_mb():
+    """This process's peak resident set size in MiB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(case, instrument=False, sample=False, trace_dir=None):
+    """Runs one Case in this (fresh) process and returns its result row.
+
+    The process takes the algorithm's directory as working directory and
+    first import path, as if the algorithm's script were run there, with
+    the modules its sibling directories share (e.g. frozen_lake/common)
+    and the repository's (common/) next, and is seeded with the case's
+    seed before the instance is built. Only `solve` is timed; the peak RSS
+    covers setup and solve. With `instrument` and/or `sample` the solver
+    runs under an `instrumentation.Instrumentation` (phase timers and
+    counters, sampling profiler) whose JSON trace is written to
+    `trace_dir`; this slows the run down, so its wall time is not
+    comparable with uninstrumented ones.
+    """
+    directory, adapter = ADAPTERS[case.algorithm]
+    directory = os.path.join(ROOT, directory)
+    os.chdir(directory)
+    sys.path.insert(0, os.path.join(ROOT, "common"))
+    sys.path.insert(0, os.path.join(os.path.dirname(directory), "common"))
+    sys.path.insert(0, directory)
+    random.seed(case.seed)
+    np.random.seed(case.seed)
+
+    row = {"Suite": case.suite, "Algorithm": case.algorithm, "Instance": str(case.instance),
+           "Seed": case.seed, "Params": case.params}
+    try:
+        instrumentation = None
+        if instrument or sample:
+            from instrumentation import Instrumentation
+            instrumentation = Instrumentation(case.algorithm, timers=instrument, sample=sample,
+                                              instance=case.instance, seed=case.seed, params=case.params)
+        solve = adapter(case.instance, json.loads(case.params), instrumentation)
+        row["SetupRSSMB"] = peak_rss_mb()
+        if instrumentation is not None:
+            instrumentation.start()
+        start = time.perf_counter()
+        result = solve()
+        elapsed = time.perf_counter() - start
+        if instrumentation is not None:
+            instrumentation.stop()
+            row["Trace"] = _write_trace(instrumentation, case, trace_dir or os.getcwd())
+    except Exception:
+        row.update(Status="error", Error=traceback.format_exc(limit=-3), PeakRSSMB=peak_rss_mb())
+        return row
+    row.update(Status=result["status"], WallTime=elapsed, Evaluations=result["evaluations"],
+               EvalsPerSec=result["evaluations"] / elapsed if elapsed > 0 else None,
+               Iterations=result["iterations"], Cost=result["cost"], Quality=result["quality"],
+               Metric=result["metric"], PeakRSSMB=peak_rss_mb())
+    return row
+
+
+def _write_trace(instrumentation, case, trace_dir):
+    os.makedirs(trace_dir, exist_ok=True)
+    digest = hashlib.blake2b(case.params.encode(), digest_size=4).hexdigest()
+    instance = os.path.splitext(os.path.basename(str(case.instance)))[0]
+    path = os.path.join(trace_dir, f"{case.algorithm}-{instance}-{digest}-{case.seed}.json")
+    instrumentation.write(path)
+    return path
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(cases, workers=None, progress=True, instrument=False, sample=False, trace_dir=None):
+    """Runs `cases` in parallel and returns one row per case as a DataFrame.
+
+    Every case gets its own spawned worker process (max_tasks_per_child=1),
+    so runs cannot share caches or imported modules and each one's peak RSS
+    is its own. Concurrent cases compete for cores and memory bandwidth;
+    use workers=1 when wall times must be comparable to an earlier run.
+    `instrument`, `sample` and `trace_dir` are passed on to `run_case`.
+    """
+    workers = min(workers or os.cpu_count() or 1, max(len(cases), 1))
+    context = {"Commit": git_commit(), "Host": platform.node(), "Python": platform.python_version()}
+    rows = []
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   max_tasks_per_child=1)
+    try:
+        futures = {executor.submit(run_case, case, instrument, sample, trace_dir): case for case in cases}
+        for done, future in enumerate(as_completed(futures), 1):
+            case = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:  # the worker died, e.g. out of memory
+                row = {"Suite": case.suite, "Algorithm": case.algorithm, "Instance": str(case.instance),
+                       "Seed": case.seed, "Params": case.params, "Status": "error", "Error": repr(e)}
+            row.update(context, Timestamp=time.time())
+            rows.append(row)
+            if progress:
+                print(f"[{done}/{len(cases)}] {case.algorithm} {case.instance} seed={case.seed} "
+                      f"{case.params}: {row['Status']} {row.get('WallTime') or 0:.3f}s")
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return pd.DataFrame(rows, columns=COLUMNS)
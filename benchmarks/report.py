@@ -0,0 +1,132 @@
+import argparse
+import json
+import sys
+import numpy as np
+import pandas as pd
+
+KEY = ["Algorithm", "Instance", "Params"]
+
+
+def load_runs(*paths):
+    """Benchmark result files (as written by run.py) as one DataFrame."""
+    frames = [pd.read_csv(path, dtype={"Instance": str, "Params": str}) for path in paths]
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize(runs):
+    """One row per algorithm, instance and parameter setting.
+
+    Times and throughput are medians over seeds, which shrug off the odd run
+    slowed down by a busy machine; memory is the worst seed and quality the
+    mean and best over the runs that produced a solution.
+    """
+    solved = runs["Status"].isin(["ok", "time_limit"])
+    grouped = runs.assign(Solved=solved, SolvedQuality=runs["Quality"].where(solved)).groupby(KEY, sort=True)
+    return pd.DataFrame({
+        "Runs": grouped.size(),
+        "Errors": grouped["Status"].agg(lambda status: int((status == "error").sum())),
+        "SuccessRate": grouped["Solved"].mean(),
+        "WallTime": grouped["WallTime"].median(),
+        "EvalsPerSec": grouped["EvalsPerSec"].median(),
+        "PeakRSSMB": grouped["PeakRSSMB"].max(),
+        "Metric": grouped["Metric"].first(),
+        "Quality": grouped["SolvedQuality"].mean(),
+        "BestQuality": grouped["SolvedQuality"].min(),
+    }).reset_index()
+
+
+def comparison(summary, value="Quality"):
+    """`value` per instance (rows) and algorithm (columns); parameter
+    settings are folded into the algorithm's column name."""
+    columns = summary["Algorithm"] + " " + summary["Params"].map(_short_params)
+    table = summary.assign(Setting=columns.str.strip()).pivot_table(
+        index="Instance", columns="Setting", values=value, aggfunc="first")
+    return table.reset_index()
+
+
+def _short_params(params):
+    params = json.loads(params) if isinstance(params, str) and params else {}
+    return ",".join(f"{k}={v}" for k, v in sorted(params.items()))
+
+
+def regressions(current, baseline, tolerance=0.10, quality_tolerance=0.0):
+    """Settings of summary `current` that got worse than summary `baseline`.
+
+    A setting regresses when its median wall time or peak RSS grows by more
+    than `tolerance` (a fraction), its throughput drops by more than that,
+    its mean quality worsens by more than `quality_tolerance` (absolute, in
+    the setting's own metric) or its success rate drops. Settings missing
+    from either side are skipped.
+    """
+    merged = current.merge(baseline, on=KEY, suffixes=("", "Base"))
+    merged["TimeRatio"] = merged["WallTime"] / merged["WallTimeBase"]
+    merged["ThroughputRatio"] = merged["EvalsPerSec"] / merged["EvalsPerSecBase"]
+    merged["RSSRatio"] = merged["PeakRSSMB"] / merged["PeakRSSMBBase"]
+    merged["QualityDelta"] = merged["Quality"] - merged["QualityBase"]
+    checks = {
+        "time": merged["TimeRatio"] > 1 + tolerance,
+        "throughput": merged["ThroughputRatio"] < 1 - tolerance,
+        "memory": merged["RSSRatio"] > 1 + tolerance,
+        "quality": merged["QualityDelta"] > quality_tolerance,
+        "success": merged["SuccessRate"] < merged["SuccessRateBase"],
+    }
+    merged["Regressions"] = [",".join(name for name, failed in checks.items() if failed.iloc[i])
+                             for i in range(len(merged))]
+    columns = KEY + ["TimeRatio", "ThroughputRatio", "RSSRatio", "QualityDelta", "SuccessRate",
+                     "SuccessRateBase", "Regressions"]
+    return merged.loc[merged["Regressions"] != "", columns].reset_index(drop=True)
+
+
+def markdown(frame, digits=4):
+    """`frame` as a GitHub-flavoured markdown table."""
+    def cell(value):
+        if isinstance(value, (float, np.floating)):
+            return "" if np.isnan(value) else f"{value:.{digits}g}"
+        return str(value)
+    lines = ["| " + " | ".join(map(str, frame.columns)) + " |",
+             "|" + "---|" * len(frame.columns)]
+    lines.extend("| " + " | ".join(cell(v) for v in row) + " |" for row in frame.itertuples(index=False))
+    return "\n".join(lines)
+
+
+def render(runs, baseline_runs=None, tolerance=0.10, quality_tolerance=0.0):
+    """Markdown report of `runs`, with a regression section against
+    `baseline_runs` when given: (text, regressions or None)."""
+    summary = summarize(runs)
+    sections = ["## Summary", markdown(summary),
+                "## Quality by instance", markdown(comparison(summary, "Quality")),
+                "## Median wall time (s) by instance", markdown(comparison(summary, "WallTime"))]
+    found = None
+    if baseline_runs is not None:
+        found = regressions(summary, summarize(baseline_runs), tolerance, quality_tolerance)
+        sections.append(f"## Regressions (tolerance {tolerance:.0%})")
+        sections.append(markdown(found) if len(found) else "None.")
+    errors = runs[runs["Status"] == "error"]
+    if len(errors):
+        sections.append("## Errors")
+        sections.extend(f"- {r.Algorithm} {r.Instance} seed={r.Seed} {r.Params}:\n```\n{r.Error}```"
+                        for r in errors.itertuples())
+    return "\n\n".join(sections) + "\n", found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize benchmark results and check for regressions.")
+    parser.add_argument("results", nargs="+", help="result CSV files written by run.py")
+    parser.add_argument("--baseline", nargs="+", help="result CSV files to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--quality-tolerance", type=float, default=0.0)
+    parser.add_argument("--out", help="write the markdown report here as well")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    baseline = load_runs(*args.baseline) if args.baseline else None
+    text, found = render(load_runs(*args.results), baseline, args.tolerance, args.quality_tolerance)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    return 1 if args.fail_on_regression and found is not None and len(found) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import time
+from harness import git_commit, run_suite
+from report import load_runs, render
+from suites import SUITES, expand
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Sweep algorithms x instances x seeds x parameters and report the results.")
+    parser.add_argument("--suite", default="smoke", choices=sorted(SUITES))
+    parser.add_argument("--algorithms", nargs="+", help="only run these algorithms of the suite")
+    parser.add_argument("--workers", type=int, help="parallel cases (default: one per CPU)")
+    parser.add_argument("--label", help="result file name (default: <suite>-<time>-<commit>)")
+    parser.add_argument("--baseline", nargs="+", help="result CSV files to check for regressions against")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--quality-tolerance", type=float, default=0.0)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--instrument", action="store_true",
+                        help="time solver phases and count moves; writes a JSON trace per case")
+    parser.add_argument("--sample", action="store_true",
+                        help="run the sampling profiler; its stacks go into the traces")
+    args = parser.parse_args(argv)
+
+    cases = expand(args.suite)
+    if args.algorithms:
+        cases = [case for case in cases if case.algorithm in args.algorithms]
+    label = args.label or f"{args.suite}-{time.strftime('%Y%m%d-%H%M%S')}-{git_commit() or 'nogit'}"
+    print(f"--- {len(cases)} case(s) of suite '{args.suite}' ---")
+    runs = run_suite(cases, workers=args.workers, instrument=args.instrument, sample=args.sample,
+                     trace_dir=os.path.join(RESULTS_DIR, label))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{label}.csv")
+    runs.to_csv(path, index=False)
+    # read back so the report sees exactly what a later comparison will
+    runs = load_runs(path)
+    baseline = load_runs(*args.baseline) if args.baseline else None
+    text, found = render(runs, baseline, args.tolerance, args.quality_tolerance)
+    with open(os.path.join(RESULTS_DIR, f"{label}.md"), "w") as f:
+        f.write(text)
+    print(text)
+    print(f"Results saved to '{path}'")
+    return 1 if args.fail_on_regression and found is not None and len(found) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
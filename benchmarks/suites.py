@@ -0,0 +1,67 @@
+import itertools
+import json
+from collections import namedtuple
+
+# one benchmark run: `instance` is a TSPLIB file for the TSP solvers and a
+# map size or a saved map (.npy, see maps.LakeMap) for the Frozen Lake
+# searches; `params` is a JSON object string
+Case = namedtuple("Case", "suite algorithm instance seed params")
+
+# A suite is a list of sweeps. Each sweep runs one algorithm on every
+# instance, seed and combination of the values listed under "params";
+# "seeds" is a count (seeds 0..n-1) or an explicit list.
+SUITES = {
+    "smoke": [
+        {"algorithm": "hill_climbing", "instances": ["eil76.tsp"], "seeds": 2,
+         "params": {"move": ["2opt"], "max_iter": [200]}},
+        {"algorithm": "simulated_annealing", "instances": ["eil76.tsp"], "seeds": 2,
+         "params": {"move": ["2opt"], "max_iter": [2000]}},
+        {"algorithm": "lin_kernighan", "instances": ["eil76.tsp"], "seeds": 2,
+         "params": {"kicks": [100], "max_iter": [None]}},
+        {"algorithm": "branch_and_bound", "instances": [4], "seeds": 2, "params": {}},
+        {"algorithm": "ida_star", "instances": [4], "seeds": 2, "params": {}},
+        {"algorithm": "mdp_planning", "instances": [4], "seeds": 2, "params": {}},
+    ],
+    "default": [
+        {"algorithm": "hill_climbing", "instances": ["eil76.tsp"], "seeds": 5,
+         "params": {"move": ["swap", "2opt", "oropt"], "start": ["random", "greedy"],
+                    "time_limit": [60]}},
+        {"algorithm": "simulated_annealing", "instances": ["eil76.tsp"], "seeds": 5,
+         "params": {"move": ["swap", "2opt"], "schedule": ["geometric", "adaptive"],
+                    "backend": ["python", "auto"], "max_iter": [50000], "time_limit": [60]}},
+        {"algorithm": "lin_kernighan", "instances": ["eil76.tsp"], "seeds": 5,
+         "params": {"kicks": [0, 1000], "start": ["random", "greedy"], "max_iter": [None],
+                    "time_limit": [60]}},
+        {"algorithm": "branch_and_bound", "instances": [4, 8, 12], "seeds": 10,
+         "params": {"timeout": [60]}},
+        {"algorithm": "ida_star", "instances": [4, 8, 12], "seeds": 10,
+         "params": {"timeout": [60], "transpositions": [None, 1 << 20]}},
+        {"algorithm": "mdp_planning", "instances": [4, 8, 12], "seeds": 10,
+         "params": {"method": ["policy_iteration"]}},
+    ],
+    # how the Frozen Lake searches scale with the grid size
+    "lake_scaling": [
+        {"algorithm": "branch_and_bound", "instances": [16, 64, 256, 1024], "seeds": 3,
+         "params": {"timeout": [300]}},
+        {"algorithm": "ida_star", "instances": [16, 64, 256, 1024], "seeds": 3,
+         "params": {"timeout": [300], "transpositions": [1 << 24]}},
+        {"algorithm": "mdp_planning", "instances": [16, 64, 256], "seeds": 3,
+         "params": {"method": ["policy_iteration"]}},
+    ],
+}
+
+
+def expand(name, suite=None):
+    """Every Case of the suite `name` (from SUITES unless `suite` is given)."""
+    cases = []
+    for sweep in SUITES[name] if suite is None else suite:
+        seeds = sweep.get("seeds", 1)
+        seeds = range(seeds) if isinstance(seeds, int) else seeds
+        grid = sweep.get("params", {})
+        keys = sorted(grid)
+        for values in itertools.product(*(grid[key] for key in keys)):
+            params = json.dumps(dict(zip(keys, values)), sort_keys=True)
+            for instance in sweep["instances"]:
+                for seed in seeds:
+                    cases.append(Case(name, sweep["algorithm"], instance, seed, params))
+    return cases
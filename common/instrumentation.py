@@ -0,0 +1,166 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+
+class Instrumentation:
+    """Opt-in per-phase timers and counters for one solver run.
+
+    Solvers take `instrumentation=None` and only touch it when one is given,
+    so uninstrumented runs pay a single `is not None` test at each hook.
+    Phases are timed as laps: `lap(name)` charges the time since the
+    previous lap (or `mark()`) to `name`, so consecutive hooks split a loop
+    iteration into phases with one clock read each. With timers=False only
+    the counters are kept. With sample=True a `SamplingProfiler` records the
+    solver thread's stacks while the run is between start() and stop().
+
+    Use as a context manager around the run; `trace()` and `write(path)`
+    export everything as JSON.
+    """
+
+    def __init__(self, name=None, timers=True, sample=False, interval=0.005, **meta):
+        self.name = name
+        self.timers = timers
+        self.meta = meta
+        self.seconds = defaultdict(float)
+        self.calls = Counter()
+        self.counters = Counter()
+        self.profiler = SamplingProfiler(interval) if sample else None
+        self.started = self.stopped = None
+        self.last = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        self.started = self.last = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.start()
+        return self
+
+    def stop(self):
+        self.stopped = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.stop()
+        return self
+
+    def mark(self):
+        """Starts the next lap without charging the time since the last one."""
+        self.last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.seconds[phase] += now - self.last
+        self.calls[phase] += 1
+        self.last = now
+
+    def add(self, phase, seconds, calls=1):
+        self.seconds[phase] += seconds
+        self.calls[phase] += calls
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def moves(self, evaluated, accepted=0):
+        """Counts `evaluated` candidate moves, `accepted` of them taken."""
+        self.counters["evaluated"] += evaluated
+        self.counters["accepted"] += accepted
+        self.counters["rejected"] += evaluated - accepted
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.stopped if self.stopped is not None else time.perf_counter()) - self.started
+
+    def trace(self):
+        """The run as a JSON-serializable dict: phases with their share of the
+        elapsed time, counters with their rates per second, and the profile."""
+        elapsed = self.elapsed()
+        trace = {
+            "name": self.name,
+            "meta": self.meta,
+            "elapsed": elapsed,
+            "phases": {phase: {"seconds": seconds, "calls": self.calls[phase],
+                               "share": seconds / elapsed if elapsed > 0 else None}
+                       for phase, seconds in sorted(self.seconds.items(), key=lambda item: -item[1])},
+            "counters": dict(self.counters),
+            "per_second": {name: value / elapsed for name, value in self.counters.items()}
+            if elapsed > 0 else {},
+        }
+        if self.profiler is not None:
+            trace["profile"] = self.profiler.summary()
+        return trace
+
+    def write(self, path):
+        with open(path, "w") as f:
+            json.dump(self.trace(), f, indent=2, default=str)
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack every `interval` seconds.
+
+    A daemon thread reads the target's current frame through
+    sys._current_frames(), so the profiled code is not modified or traced
+    and costs nothing until start(). Stacks are aggregated per function
+    (root first, in the collapsed format flame graph tools read) and per
+    innermost line, which shows where inside a hot function time goes.
+    Samples land at switch-interval granularity (5 ms by default) at best.
+    """
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.lines = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.lines[_where(frame.f_code, frame.f_lineno)] += 1
+            stack = []
+            while frame is not None:
+                stack.append(_where(frame.f_code, frame.f_code.co_firstlineno))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def summary(self, top=20):
+        """Sample counts: the `top` innermost lines and all collapsed stacks."""
+        return {"interval": self.interval, "samples": self.samples,
+                "hot_lines": dict(self.lines.most_common(top)), "stacks": dict(self.stacks)}
+
+    def write_collapsed(self, path):
+        """Writes the stacks as `a;b;c count` lines, e.g. for flamegraph.pl."""
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _where(code, line):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{line})"
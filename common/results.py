@@ -0,0 +1,169 @@
+import atexit
+import glob
+import json
+import multiprocessing.util
+import os
+import socket
+import tempfile
+import time
+import uuid
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (pandas' Parquet engine)
+    PART_FORMAT = "parquet"
+except ImportError:
+    PART_FORMAT = "csv"
+
+# the one schema every algorithm logs; Params holds algorithm-specific
+# settings (e.g. the annealing schedule) as JSON
+COLUMNS = {
+    "Algorithm": "string",
+    "Run": "int64",
+    "TimeTaken": "float64",
+    "Cost": "float64",
+    "Reward": "float64",
+    "ConvergencePoint": "float64",
+    "Status": "string",
+    "Path": "string",
+    "Params": "string",
+    "Timestamp": "float64",
+}
+
+# legacy CSV headers that map onto a schema column
+_LEGACY_NAMES = {"Distance": "Cost"}
+
+
+def _number(value):
+    """float(value), or NaN for the None / "None" / "Timeout" placeholders."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=list(COLUMNS)).astype(COLUMNS)
+
+
+class ResultsStore:
+    """Buffered, append-only results table in a directory of part files.
+
+    Rows are kept in memory and written `buffer_rows` at a time as one
+    Parquet part (CSV without pyarrow). Each writer names its parts after
+    its host, pid and a random id, and renames them into place only when
+    complete, so any number of processes can log into the same directory
+    without locks; `load_results` reads them all back as one DataFrame.
+    """
+
+    def __init__(self, directory, buffer_rows=1024):
+        self.directory = directory
+        self.buffer_rows = buffer_rows
+        self.rows = []
+        self.pid = os.getpid()
+        self.writer_id = f"{socket.gethostname()}-{self.pid}-{uuid.uuid4().hex[:8]}"
+        self.parts = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def append(self, algorithm, run_id, time_taken, cost, reward=1, convergence_point=None,
+               path=None, status="ok", **params):
+        self.rows.append({
+            "Algorithm": algorithm,
+            "Run": int(run_id),
+            "TimeTaken": _number(time_taken),
+            "Cost": _number(cost),
+            "Reward": _number(reward),
+            "ConvergencePoint": _number(convergence_point),
+            "Status": status,
+            "Path": None if path is None else str(path),
+            "Params": json.dumps(params, sort_keys=True, default=str),
+            "Timestamp": time.time(),
+        })
+        if len(self.rows) >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        frame = _frame(self.rows)
+        name = os.path.join(self.directory, f"part-{self.writer_id}-{self.parts:05d}.{PART_FORMAT}")
+        # dot-prefixed temporaries are skipped by readers of the directory
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".tmp")
+        os.close(fd)
+        if PART_FORMAT == "parquet":
+            frame.to_parquet(tmp, index=False)
+        else:
+            frame.to_csv(tmp, index=False)
+        os.replace(tmp, name)
+        self.rows = []
+        self.parts += 1
+
+
+_stores = {}
+
+
+def results_store(directory):
+    """This process's store for `directory`, flushed when the process exits.
+
+    Stores are per process: a forked child starts its own instead of
+    re-writing rows buffered by its parent. Besides atexit, a
+    multiprocessing finalizer flushes pool workers, which leave through
+    os._exit.
+    """
+    key = (os.getpid(), os.path.abspath(directory))
+    if key not in _stores:
+        if not any(pid == key[0] for pid, _ in _stores):
+            multiprocessing.util.Finalize(None, flush_all, exitpriority=10)
+        _stores[key] = ResultsStore(directory)
+    return _stores[key]
+
+
+@atexit.register
+def flush_all():
+    for store in _stores.values():
+        if store.pid == os.getpid():
+            store.flush()
+
+
+def log_performance(filepath, algorithm, run_id, time_taken, cost, reward=1, convergence_point=None,
+                    path=None, status="ok", **params):
+    """Buffers one run in the results store at directory `filepath`.
+
+    All algorithms share the schema in `COLUMNS`; extra keyword arguments
+    are kept in its Params column. Rows are written in batches and at exit,
+    and read back with `load_results`.
+    """
+    results_store(filepath).append(algorithm, run_id, time_taken, cost, reward, convergence_point,
+                                   path, status, **params)
+
+
+def load_results(directory, legacy_csv=None):
+    """Every run logged into `directory` as one DataFrame in the shared schema.
+
+    `legacy_csv` names an old per-row CSV log to include, with its columns
+    mapped onto the schema.
+    """
+    frames = []
+    parquet = sorted(glob.glob(os.path.join(directory, "part-*.parquet")))
+    if parquet:
+        frames.append(pd.read_parquet(parquet))
+    frames.extend(pd.read_csv(part) for part in sorted(glob.glob(os.path.join(directory, "part-*.csv"))))
+    if legacy_csv is not None and os.path.exists(legacy_csv):
+        frames.append(_from_legacy(pd.read_csv(legacy_csv)))
+    if not frames:
+        return _frame([])
+    return pd.concat([frame.astype(COLUMNS) for frame in frames], ignore_index=True)
+
+
+def _from_legacy(frame):
+    frame = frame.rename(columns={old: new for old, new in _LEGACY_NAMES.items() if new not in frame})
+    extra = [column for column in frame if column not in COLUMNS]
+    legacy = pd.DataFrame(index=frame.index)
+    for column in COLUMNS:
+        legacy[column] = frame[column] if column in frame else None
+    for column in ("TimeTaken", "Cost", "Reward", "ConvergencePoint"):
+        legacy[column] = legacy[column].map(_number)
+    legacy["Status"] = legacy["Status"].fillna("ok")
+    legacy["Params"] = [json.dumps({k.lower(): row[k] for k in extra if k != "Distance"}, default=str)
+                        for _, row in frame.iterrows()]
+    return legacy
@@ -1,78 +1,172 @@
-import gym
+import os
+import sys
 import numpy as np
 import heapq
 import time
+from array import array
 from utils import start_timer, stop_timer, log_performance
-from gym.envs.toy_text.frozen_lake import generate_random_map
-
-# Generate random 4x4 map and create environment
-random_map = generate_random_map(size=4)
-print("Generated Map:")
-for row in random_map:
-    print(' '.join(row))
-print("\n")
-
-env = gym.make("FrozenLake-v1", desc=random_map, is_slippery=True)
-grid_size = 4
-goal_state = env.observation_space.n - 1
-
-def state_to_xy(state):
+# lake.py and maps.py are shared by both Frozen Lake directories, in frozen_lake/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from lake import compile_lake
+from maps import generate_map
+from mdp import compile_mdp, path_policy, solve, success_probability
+
+try:
+    import gym
+except ImportError:  # searching a map does not need gym
+    gym = None
+
+# best_g of states not reached yet
+UNREACHED = 2 ** 31 - 1
+
+def make_env(size=4, is_slippery=True):
+    """Random size x size map (`maps.generate_map`) and its gym environment."""
+    if gym is None:
+        raise ImportError("make_env needs gym")
+    random_map = generate_map(size, is_slippery=is_slippery).desc
+    return gym.make("FrozenLake-v1", desc=random_map, is_slippery=is_slippery), random_map
+
+def state_to_xy(state, grid_size):
     return divmod(state, grid_size)
 
-def manhattan_distance(state):
-    sx, sy = state_to_xy(state)
-    gx, gy = state_to_xy(goal_state)
+def manhattan_distance(state, goal_state, grid_size):
+    sx, sy = state_to_xy(state, grid_size)
+    gx, gy = state_to_xy(goal_state, grid_size)
     return abs(sx - gx) + abs(sy - gy)
 
-def branch_and_bound(env, timeout=600):
-    visited = set()
-    pq = []
-    heapq.heappush(pq, (manhattan_distance(0), 0, [0], 0))
+def reconstruct_path(parents, states, node):
+    """States from the root to `node`, following the node store's parent indices."""
+    path = []
+    while node >= 0:
+        path.append(states[node])
+        node = parents[node]
+    path.reverse()
+    return path
+
+def branch_and_bound(env, timeout=600, instrumentation=None):
+    """Best-first search from the start to the goal: (path, cost), or (None, None).
+
+    `env` is a `maps.LakeMap`, a `lake.CompiledLake` or a gym FrozenLake
+    env; either way the search runs on the compiled successor, passability
+    and heuristic arrays.
+
+    Search nodes live in a node store of parallel arrays (state, parent
+    index, g-cost); heap entries are just (f, node index), and the path is
+    only rebuilt from the parent indices once the goal is popped. Each
+    state's best g so far is kept, so successors that do not improve it are
+    not pushed, and heap entries that were superseded or whose state is
+    already closed are dropped when popped. The Manhattan heuristic is
+    consistent, so a state's first expansion is at its optimal cost.
+
+    An `instrumentation.Instrumentation` times popping and expanding nodes
+    and counts expanded, generated and pruned nodes (holes, closed states
+    and no better g), stale queue entries and timeouts.
+    """
+    timed = instrumentation is not None and instrumentation.timers
+    lake = compile_lake(env)
+    start, goal_state, successors, passable, heuristic = lake.tables()
+
+    # node store: node i reached `states[i]` from node `parents[i]` at cost `costs[i]`
+    states, parents, costs = array("i", [start]), array("i", [-1]), array("i", [0])
+    best_g = array("i", [UNREACHED]) * lake.n_states
+    best_g[start] = 0
+    closed = bytearray(lake.n_states)
+    pq = [(heuristic[start], 0)]
+    expanded = generated = pruned = stale = 0
+    timed_out = False
+    result = None, None
 
     start_time = time.time()
 
     while pq:
         if time.time() - start_time > timeout:
             print(" Timeout! Goal not reached within time limit.")
-            return None, None
+            timed_out = True
+            break
 
-        _, cost, path, state = heapq.heappop(pq)
+        if timed:
+            instrumentation.mark()
+        _, node = heapq.heappop(pq)
+        state, cost = states[node], costs[node]
+        if timed:
+            instrumentation.lap("pop")
 
         if state == goal_state:
-            return path, cost
+            result = reconstruct_path(parents, states, node), cost
+            break
 
-        if state in visited:
+        if closed[state] or cost > best_g[state]:
+            stale += 1
             continue
-        visited.add(state)
-
-        for action in range(env.action_space.n):
-            for prob, next_state, reward, _ in env.env.P[state][action]:
-                if prob == 0.0:  # Skip impossible transitions
-                    continue
-                    
-                x, y = state_to_xy(next_state)
-                tile = env.unwrapped.desc[x][y]
-                
-                # Skip holes and already visited states
-                if tile == b'H' or next_state in visited:
-                    continue
-                    
-                priority = cost + 1 + manhattan_distance(next_state)
-                heapq.heappush(pq, (priority, cost + 1, path + [next_state], next_state))
-
-    return None, None
+        closed[state] = 1
+        expanded += 1
+
+        for next_state in successors[state]:
+            # Skip holes, closed states and states already reached as cheaply
+            if not passable[next_state] or closed[next_state] or cost + 1 >= best_g[next_state]:
+                pruned += 1
+                continue
+
+            best_g[next_state] = cost + 1
+            states.append(next_state)
+            parents.append(node)
+            costs.append(cost + 1)
+            heapq.heappush(pq, (cost + 1 + heuristic[next_state], len(states) - 1))
+            generated += 1
+        if timed:
+            instrumentation.lap("expand")
+
+    if instrumentation is not None:
+        for name, value in (("expanded", expanded), ("generated", generated), ("pruned", pruned),
+                            ("stale", stale), ("timeout", timed_out), ("nodes", len(states))):
+            instrumentation.count(name, value)
+    return result
+
+def plan(env, method="policy_iteration", gamma=1.0, tol=1e-8, instrumentation=None):
+    """Plans for the lake's actual dynamics instead of searching a path: (policy, success).
+
+    `branch_and_bound` treats every transition a slippery action can make as
+    an edge it can choose, so its path is only followed with luck. This
+    solves the lake as an MDP (`mdp.solve` `method`, from `mdp.SOLVERS` or
+    the slow `mdp.REFERENCE_SOLVERS`, on the sparse transition tensor of
+    `mdp.compile_mdp(env)`) for a policy, an action per
+    state, maximising the probability of reaching the goal (with gamma=1),
+    and returns the probability that following it from the start does.
+    An `instrumentation.Instrumentation` counts the solver's work (sweeps,
+    evaluations or backups) and times the solve.
+    """
+    timed = instrumentation is not None and instrumentation.timers
+    mdp = compile_mdp(env)
+    if timed:
+        instrumentation.mark()
+    _, policy, work, success = solve(mdp, method, gamma, tol)
+    if timed:
+        instrumentation.lap("solve")
+    if instrumentation is not None:
+        instrumentation.count("work", work)
+    return policy, success
 
 if __name__ == "__main__":
+    # Random map of the size given on the command line (4x4 by default)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    lake_map = generate_map(size, is_slippery=True)
+    lake_map.save("bnb_map.npy")
+    random_map = lake_map.desc
+    env = lake_map.compile()
+    print("Generated Map:")
+    for row in random_map[:32]:
+        print(' '.join(row[:32]))
+    print("\n")
+
     successful_path = None
     for run in range(1, 11):
-        env.reset()
         start = start_timer()
 
         path, cost = branch_and_bound(env, timeout=600)
         time_taken = stop_timer(start)
 
         reward = 1 if path else 0
-        convergence = path[-1] if path else "None"
+        convergence = path[-1] if path else None
 
         print(f"Run {run} | Time: {time_taken:.4f}s | Cost: {cost} | Path: {path}")
 
@@ -80,14 +174,15 @@ if __name__ == "__main__":
             successful_path = path  # Store the first successful path
 
         log_performance(
-            filepath="results.csv",
+            filepath="results",
             algorithm="Branch and Bound",
             run_id=run,
             time_taken=time_taken,
+            cost=cost,
             reward=reward,
-            convergence_point=str(convergence),
+            convergence_point=convergence,
             path=path,
-            cost=cost
+            status="ok" if path else "failed"
         )
     
     # Save the successful path and map for the GIF generation
@@ -97,4 +192,15 @@ if __name__ == "__main__":
             f.write(f"PATH:\n{successful_path}\n")
         print(f"\n Successful path saved to 'successful_path.txt'")
     else:
-        print("\n No successful path found in 10 runs")
\ No newline at end of file
+        print("\n No successful path found in 10 runs")
+
+    # On the slippery lake the path is a plan for a deterministic one; compare
+    # following it with the policy planned for the actual dynamics
+    mdp = compile_mdp(lake_map)
+    if successful_path:
+        print(f" Following the path succeeds with probability "
+              f"{success_probability(mdp, path_policy(mdp, successful_path)):.4f}")
+    start = start_timer()
+    policy, success = plan(mdp)
+    print(f" Policy iteration policy succeeds with probability {success:.4f} "
+          f"(planned in {stop_timer(start):.4f}s)")
\ No newline at end of file
@@ -1,8 +1,12 @@
 import pandas as pd
 import matplotlib.pyplot as plt
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from results import load_results
 
 # Load results
-df = pd.read_csv("results.csv")
+df = load_results("results", legacy_csv="results.csv")
 
 bnb_df = df[df['Algorithm'] == 'Branch and Bound']
 
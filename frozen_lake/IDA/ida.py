@@ -1,66 +1,131 @@
-import gym
+import os
+import sys
 import numpy as np
 import time
 from utils import start_timer, stop_timer, log_performance
-from gym.envs.toy_text.frozen_lake import generate_random_map
+# lake.py and maps.py are shared by both Frozen Lake directories, in frozen_lake/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from lake import compile_lake
+from maps import generate_map
+
+try:
+    import gym
+except ImportError:  # searching a map does not need gym
+    gym = None
 
-# Generate random 4x4 map
-random_map = generate_random_map(size=4)
-env = gym.make("FrozenLake-v1", desc=random_map, is_slippery=False)
-grid_size = 4
-goal_state = env.observation_space.n - 1
 TIMEOUT_SECONDS = 600
+# dfs visits between clock reads
+TIME_CHECK_EVERY = 1024
 
-print("Generated Map:")
-for row in random_map:
-    print(' '.join(row))
-print("\n")
+def make_env(size=4, is_slippery=False):
+    """Random size x size map (`maps.generate_map`) and its gym environment."""
+    if gym is None:
+        raise ImportError("make_env needs gym")
+    random_map = generate_map(size, is_slippery=is_slippery).desc
+    return gym.make("FrozenLake-v1", desc=random_map, is_slippery=is_slippery), random_map
 
-def state_to_xy(state):
+def state_to_xy(state, grid_size):
     return divmod(state, grid_size)
 
-def manhattan_distance(state):
-    sx, sy = state_to_xy(state)
-    gx, gy = state_to_xy(goal_state)
+def manhattan_distance(state, goal_state, grid_size):
+    sx, sy = state_to_xy(state, grid_size)
+    gx, gy = state_to_xy(goal_state, grid_size)
     return abs(sx - gx) + abs(sy - gy)
 
-def dfs(state, path, g, bound, visited, env, start_time):
-    f = g + manhattan_distance(state)
-    if time.time() - start_time > TIMEOUT_SECONDS:
-        return "timeout", None
-    if f > bound:
-        return f, None
-    if state == goal_state:
-        return "found", path
-        
-    x, y = state_to_xy(state)
-    tile = env.unwrapped.desc[x][y]
-    if tile == b'H':  # Skip holes
-        return float("inf"), None
-        
-    visited.add(state)
+def dfs(tables, bound, start_time, timeout=TIMEOUT_SECONDS, instrumentation=None, transpositions=None):
+    """One depth-first pass under `bound` over a `lake.SearchTables`:
+    ("found", path), ("timeout", None) or (smallest f over the bound, None).
+
+    The recursion is unrolled into an explicit stack: `path` holds the
+    states from the start down to the current one, `next_child` the index
+    of each one's next successor to try, and the `on_path` bytes replace
+    the per-node visited copies. The clock is read every TIME_CHECK_EVERY
+    visited nodes. With `transpositions`, a table of up to that many
+    states keeps the smallest g each state was expanded at in this pass,
+    and a state reached again at no smaller g is not expanded again.
+    """
+    _, goal, successors, passable, heuristic = tables
+    path, next_child = [], []
+    on_path = bytearray(len(passable))
+    table = {} if transpositions else None
     min_bound = float("inf")
+    visits = expanded = cutoff = transposed = 0
+    result = None
+
+    state = tables.start
+    while True:
+        if state is not None:
+            visits += 1
+            if visits % TIME_CHECK_EVERY == 0 and time.time() - start_time > timeout:
+                result = "timeout", None
+                break
+            g = len(path)
+            f = g + heuristic[state]
+            if f > bound:
+                cutoff += 1
+                if f < min_bound:
+                    min_bound = f
+            elif state == goal:
+                result = "found", path + [state]
+                break
+            elif passable[state]:  # holes end the path
+                seen = table.get(state) if table is not None else None
+                if seen is not None and seen <= g:
+                    transposed += 1
+                else:
+                    if table is not None and (seen is not None or len(table) < transpositions):
+                        table[state] = g
+                    expanded += 1
+                    path.append(state)
+                    next_child.append(0)
+                    on_path[state] = 1
+            state = None
+
+        if not path:
+            break
+        children = successors[path[-1]]
+        i = next_child[-1]
+        while i < len(children) and on_path[children[i]]:
+            i += 1
+        if i < len(children):
+            next_child[-1] = i + 1
+            state = children[i]
+        else:
+            on_path[path.pop()] = 0
+            next_child.pop()
 
-    for action in range(env.action_space.n):
-        for prob, next_state, _, _ in env.env.P[state][action]:
-            if prob == 0.0 or next_state in visited:
-                continue
-                
-            result, new_path = dfs(next_state, path + [next_state], g + 1, bound, visited.copy(), env, start_time)
-            if result == "found":
-                return "found", new_path
-            if result == "timeout":
-                return "timeout", None
-            if isinstance(result, (int, float)) and result < min_bound:
-                min_bound = result
-    return min_bound, None
-
-def ida_star(env):
-    bound = manhattan_distance(0)
-    path = [0]
+    if instrumentation is not None:
+        for name, value in (("expanded", expanded), ("cutoff", cutoff), ("transposed", transposed)):
+            instrumentation.count(name, value)
+    return result if result is not None else (min_bound, None)
+
+def ida_star(env, timeout=TIMEOUT_SECONDS, instrumentation=None, transpositions=None):
+    """Iterative deepening A* from the start to the goal: (path, cost, timed_out).
+
+    `env` is a `maps.LakeMap`, a `lake.CompiledLake` or a gym FrozenLake
+    env; either way the search runs on the compiled successor, passability
+    and heuristic arrays.
+    `transpositions` bounds the size of the per-pass transposition table
+    (see `dfs`); None searches without one.
+
+    An `instrumentation.Instrumentation` times each deepening iteration and
+    counts iterations, expanded nodes, cutoffs (nodes over the bound),
+    transpositions and timeouts.
+    """
+    timed = instrumentation is not None and instrumentation.timers
+    tables = compile_lake(env).tables()
+    bound = tables.heuristic[tables.start]
     start_time = time.time()
     while True:
-        result, new_path = dfs(0, path, 0, bound, set(), env, start_time)
+        if instrumentation is not None:
+            instrumentation.count("iterations")
+            if timed:
+                instrumentation.mark()
+        result, new_path = dfs(tables, bound, start_time, timeout, instrumentation, transpositions)
+        if timed:
+            instrumentation.lap("deepening")
+        if instrumentation is not None and result == "timeout":
+            instrumentation.count("timeout")
         if result == "found":
             return new_path, len(new_path) - 1, False
         if result == "timeout":
@@ -70,15 +135,26 @@ def ida_star(env):
         bound = result
 
 if __name__ == "__main__":
+    # Random map of the size given on the command line (4x4 by default)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    lake_map = generate_map(size, is_slippery=False)
+    lake_map.save("ida_map.npy")
+    random_map = lake_map.desc
+    env = lake_map.compile()
+
+    print("Generated Map:")
+    for row in random_map[:32]:
+        print(' '.join(row[:32]))
+    print("\n")
+
     successful_path = None
     for run in range(1, 11):
-        env.reset()
         start = start_timer()
         path, cost, is_timeout = ida_star(env)
         time_taken = stop_timer(start)
 
         reward = 1 if path else 0
-        convergence = path[-1] if path else "Timeout" if is_timeout else "None"
+        convergence = path[-1] if path else None
 
         print(f"Run {run} | Time: {time_taken:.5f}s | Cost: {cost} | Path: {path}")
 
@@ -86,14 +162,15 @@ if __name__ == "__main__":
             successful_path = path  # Store the first successful path
 
         log_performance(
-            filepath="results.csv",
+            filepath="results",
             algorithm="IDA*",
             run_id=run,
             time_taken=time_taken,
             cost=cost,
             reward=reward,
-            convergence_point=str(convergence),
-            path=path
+            convergence_point=convergence,
+            path=path,
+            status="ok" if path else "timeout" if is_timeout else "failed"
         )
     
     # Save the successful path and map for the GIF generation
@@ -23,7 +23,7 @@ except Exception as e:
 # Create environment with the same map
 env = gym.make("FrozenLake-v1", desc=random_map, is_slippery=False)
 desc = env.unwrapped.desc.astype(str)
-grid_size = 4
+grid_size = len(random_map)
 
 # Verify path doesn't go through holes
 valid_path = []
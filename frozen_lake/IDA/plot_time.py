@@ -1,7 +1,10 @@
-import pandas as pd
 import matplotlib.pyplot as plt
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from results import load_results
 
-df = pd.read_csv("results.csv")
+df = load_results("results", legacy_csv="results.csv")
 
 ida_df = df[df['Algorithm'] == 'IDA*']
 
@@ -0,0 +1,79 @@
+import numpy as np
+from collections import namedtuple
+
+# FrozenLake's actions and their (row, column) steps
+LEFT, DOWN, RIGHT, UP = range(4)
+STEPS = np.array([(0, -1), (1, 0), (0, 1), (-1, 0)])
+
+# what the searches read, as plain ints and lists: successors[s] is a list
+SearchTables = namedtuple("SearchTables", "start goal successors passable heuristic")
+
+
+class CompiledLake:
+    """A FrozenLake map compiled once into flat arrays for the searches.
+
+    `successors[s]` lists the distinct states other than s that some action
+    from s can lead to, in the order FrozenLake's P[s][action] first
+    mentions them, padded with -1; holes and the goal are terminal and have
+    none. With is_slippery each action also slides to either side, as in
+    gym's FrozenLakeEnv. `passable[s]` is False on holes and `heuristic[s]`
+    is the Manhattan distance from s to the goal. The searches only read
+    these arrays (as plain int lists, see `tables`), never the gym env.
+    """
+
+    def __init__(self, desc, is_slippery=True):
+        self.desc = np.asarray(desc, dtype="c")
+        self.nrow, self.ncol = self.desc.shape
+        self.n_states = self.nrow * self.ncol
+        self.is_slippery = is_slippery
+        tiles = self.desc.ravel()
+        self.start = int(np.flatnonzero(tiles == b"S")[0]) if (tiles == b"S").any() else 0
+        self.goal = int(np.flatnonzero(tiles == b"G")[0]) if (tiles == b"G").any() else self.n_states - 1
+        self.passable = tiles != b"H"
+        self.terminal = (tiles == b"H") | (tiles == b"G")
+
+        rows, cols = np.divmod(np.arange(self.n_states), self.ncol)
+        goal_row, goal_col = divmod(self.goal, self.ncol)
+        self.heuristic = (np.abs(rows - goal_row) + np.abs(cols - goal_col)).astype(np.int32)
+
+        # next state of every (state, direction), walls clamping as in FrozenLakeEnv
+        targets = np.clip(rows[:, None] + STEPS[:, 0], 0, self.nrow - 1) * self.ncol \
+            + np.clip(cols[:, None] + STEPS[:, 1], 0, self.ncol - 1)
+        # directions in first-mention order over actions 0..3 (a slips to a-1, a, a+1)
+        order = [UP, LEFT, DOWN, RIGHT] if is_slippery else [LEFT, DOWN, RIGHT, UP]
+        targets = targets[:, order]
+        valid = (targets != np.arange(self.n_states)[:, None]) & ~self.terminal[:, None]
+        packed = np.argsort(~valid, axis=1, kind="stable")
+        self.successors = np.where(np.take_along_axis(valid, packed, axis=1),
+                                   np.take_along_axis(targets, packed, axis=1), -1).astype(np.int32)
+        self._tables = None
+
+    @classmethod
+    def from_env(cls, env):
+        """Compiles a gym FrozenLake env's map, reading its slipperiness off env.P."""
+        lake = env.unwrapped
+        slippery = next((len(lake.P[s][0]) > 1 for s in range(lake.nrow * lake.ncol)
+                         if bytes(lake.desc.flat[s]) not in b"GH"), True)
+        return cls(lake.desc, is_slippery=slippery)
+
+    def tables(self):
+        """The arrays as `SearchTables` of plain lists, built on first use;
+        list indexing is much cheaper than NumPy's in a Python search loop."""
+        if self._tables is None:
+            successors = [[s for s in row if s >= 0] for row in self.successors.tolist()]
+            self._tables = SearchTables(self.start, self.goal, successors, self.passable.tolist(),
+                                        self.heuristic.tolist())
+        return self._tables
+
+    def state_to_xy(self, state):
+        return divmod(state, self.ncol)
+
+
+def compile_lake(env):
+    """`env` as a CompiledLake: CompiledLakes are returned as is, `maps.LakeMap`s
+    and gym envs compiled."""
+    if isinstance(env, CompiledLake):
+        return env
+    if hasattr(env, "compile"):
+        return env.compile()
+    return CompiledLake.from_env(env)
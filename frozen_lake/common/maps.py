@@ -0,0 +1,142 @@
+import numpy as np
+from lake import CompiledLake
+
+try:
+    from scipy import ndimage
+except ImportError:
+    ndimage = None
+
+# tile codes of the uint8 map arrays, and their FrozenLake letters
+FROZEN, HOLE, START, GOAL = range(4)
+LETTERS = np.array([b"F", b"H", b"S", b"G"])
+
+
+class LakeMap:
+    """A Frozen Lake map stored as a (nrow, ncol) uint8 array of tile codes.
+
+    One byte per tile, so a 1024 x 1024 map is 1 MiB in memory and on disk
+    (`save`/`load` use .npy). `desc` gives the rows as strings for gym, and
+    `compile()` the `lake.CompiledLake` the searches run on, with the map's
+    `is_slippery` dynamics.
+    """
+
+    def __init__(self, tiles, is_slippery=True):
+        self.tiles = np.ascontiguousarray(tiles, dtype=np.uint8)
+        self.is_slippery = is_slippery
+
+    @classmethod
+    def from_desc(cls, desc, is_slippery=True):
+        """A map from FrozenLake rows of letters ("SFFF", ...)."""
+        rows = [row.decode() if isinstance(row, bytes) else str(row) for row in desc]
+        letters = np.asarray([list(row) for row in rows], dtype="S1")
+        tiles = np.full(letters.shape, FROZEN, dtype=np.uint8)
+        for code, letter in enumerate(LETTERS):
+            tiles[letters == letter] = code
+        return cls(tiles, is_slippery)
+
+    @classmethod
+    def load(cls, path, is_slippery=True):
+        """Loads a map saved by `save`, or a legacy array of row strings such as bnb_map.npy."""
+        array = np.load(path, allow_pickle=False)
+        if array.dtype.kind in "US":
+            return cls.from_desc(array.tolist(), is_slippery)
+        return cls(array, is_slippery)
+
+    def save(self, path):
+        np.save(path, self.tiles)
+
+    @property
+    def shape(self):
+        return self.tiles.shape
+
+    @property
+    def desc(self):
+        return ["".join(row) for row in LETTERS[self.tiles].astype(str).tolist()]
+
+    @property
+    def passable(self):
+        return self.tiles != HOLE
+
+    def reachable(self):
+        """Tiles reachable from the start without crossing a hole."""
+        start = np.flatnonzero(self.tiles == START)
+        return flood_fill(self.passable, divmod(int(start[0]), self.shape[1]) if start.size else (0, 0))
+
+    def is_valid(self):
+        """True if the goal can be reached from the start."""
+        goal = self.tiles == GOAL
+        return bool(goal.any()) and bool(self.reachable()[goal].any())
+
+    def compile(self):
+        return CompiledLake(LETTERS[self.tiles], is_slippery=self.is_slippery)
+
+
+def _run_ids(passable):
+    # id of the horizontal run of passable tiles each tile is in
+    previous = np.zeros_like(passable)
+    previous[:, 1:] = passable[:, :-1]
+    return np.cumsum((passable & ~previous).ravel()).reshape(passable.shape) - 1
+
+
+def label_components(passable):
+    """Labels the 4-connected components of the passable tiles (-1 on the others).
+
+    scipy's ndimage.label when installed. Otherwise the horizontal and the
+    vertical runs of passable tiles become the nodes of a graph whose edges
+    are the tiles (each joins its two runs), and its components are found
+    by vectorised hooking and pointer jumping, in a few whole-array passes
+    however long and winding the paths are.
+    """
+    passable = np.asarray(passable, dtype=bool)
+    if ndimage is not None:
+        labels, _ = ndimage.label(passable)
+        return np.where(passable, labels, -1)
+    if not passable.any():
+        return np.full(passable.shape, -1)
+    rows = _run_ids(passable)
+    columns = _run_ids(np.ascontiguousarray(passable.T)).T
+    n_rows = int(rows[-1, -1]) + 1
+    row_node = rows[passable]
+    column_node = columns[passable] + n_rows
+    parent = np.arange(n_rows + int(columns.max()) + 1)
+    while True:
+        a, b = parent[row_node], parent[column_node]
+        joined = a != b
+        if not joined.any():
+            break
+        np.minimum.at(parent, np.maximum(a, b)[joined], np.minimum(a, b)[joined])
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    return np.where(passable, parent[rows], -1)
+
+
+def flood_fill(passable, start):
+    """Boolean mask of the passable tiles 4-connected to `start` (row, col)."""
+    labels = label_components(passable)
+    if labels[start] < 0:
+        return np.zeros(labels.shape, dtype=bool)
+    return labels == labels[start]
+
+
+def generate_map(size, p=0.8, is_slippery=True, max_tries=1000):
+    """Random size x size (or (nrow, ncol)) `LakeMap` whose goal is reachable.
+
+    Tiles are frozen with probability p, drawn from np.random exactly as
+    gym's generate_random_map draws them, so a given seed gives the same
+    maps; the start is the top-left tile and the goal the bottom-right one.
+    Unreachable draws are redrawn, checked by `flood_fill` instead of a
+    per-tile DFS, up to `max_tries` times.
+    """
+    shape = (size, size) if np.ndim(size) == 0 else tuple(size)
+    p = min(1, p)
+    for _ in range(max_tries):
+        tiles = np.random.choice(2, shape, p=[p, 1 - p]).astype(np.uint8)
+        tiles[0, 0] = START
+        tiles[-1, -1] = GOAL
+        lake_map = LakeMap(tiles, is_slippery)
+        if lake_map.is_valid():
+            return lake_map
+    raise ValueError(f"no valid {shape[0]}x{shape[1]} map with p={p} in {max_tries} tries")
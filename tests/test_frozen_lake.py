@@ -0,0 +1,100 @@
+import os
+import sys
+from collections import deque
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "frozen_lake", "common"))
+sys.path.insert(0, os.path.join(ROOT, "frozen_lake", "BNB"))
+sys.path.insert(0, os.path.join(ROOT, "frozen_lake", "IDA"))
+
+from bnb import branch_and_bound  # noqa: E402
+from ida import ida_star  # noqa: E402
+import maps  # noqa: E402
+from maps import FROZEN, GOAL, HOLE, START, LakeMap  # noqa: E402
+
+STEPS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+
+def random_map(shape, holes, seed, is_slippery=True):
+    """Start top-left, goal bottom-right, each other tile a hole with
+    probability `holes`; the goal need not be reachable."""
+    rng = np.random.default_rng(seed)
+    tiles = np.where(rng.random(shape) < holes, HOLE, FROZEN).astype(np.uint8)
+    tiles[0, 0] = START
+    tiles[-1, -1] = GOAL
+    return LakeMap(tiles, is_slippery)
+
+
+def bfs_cost(lake_map):
+    """Fewest steps from the start to the goal around the holes, or None."""
+    tiles = lake_map.tiles
+    nrow, ncol = tiles.shape
+    start = tuple(np.argwhere(tiles == START)[0])
+    cost = {start: 0}
+    queue = deque([start])
+    while queue:
+        row, col = queue.popleft()
+        if tiles[row, col] == GOAL:
+            return cost[row, col]
+        for dr, dc in STEPS:
+            tile = row + dr, col + dc
+            if 0 <= tile[0] < nrow and 0 <= tile[1] < ncol and tiles[tile] != HOLE and tile not in cost:
+                cost[tile] = cost[row, col] + 1
+                queue.append(tile)
+    return None
+
+
+def assert_valid_path(lake_map, path, cost):
+    tiles = lake_map.tiles.ravel()
+    ncol = lake_map.shape[1]
+    assert tiles[path[0]] == START and tiles[path[-1]] == GOAL
+    assert len(path) - 1 == cost
+    assert all(tiles[state] != HOLE for state in path)
+    for a, b in zip(path, path[1:]):
+        (ra, ca), (rb, cb) = divmod(a, ncol), divmod(b, ncol)
+        assert abs(ra - rb) + abs(ca - cb) == 1
+
+
+MAPS = [((size, size), holes, seed) for size in (4, 6, 8, 12) for holes in (0.1, 0.3) for seed in range(5)] \
+    + [((3, 9), 0.2, seed) for seed in range(3)]
+
+
+@pytest.mark.parametrize("shape, holes, seed", MAPS)
+@pytest.mark.parametrize("is_slippery", [True, False])
+def test_branch_and_bound_cost_matches_bfs(shape, holes, seed, is_slippery):
+    lake_map = random_map(shape, holes, seed, is_slippery)
+    path, cost = branch_and_bound(lake_map, timeout=60)
+    assert cost == bfs_cost(lake_map)
+    if path is not None:
+        assert_valid_path(lake_map, path, cost)
+
+
+@pytest.mark.parametrize("shape, holes, seed", MAPS)
+@pytest.mark.parametrize("transpositions", [None, 1 << 10])
+def test_ida_star_cost_matches_bfs(shape, holes, seed, transpositions):
+    lake_map = random_map(shape, holes, seed, is_slippery=False)
+    path, cost, timed_out = ida_star(lake_map, timeout=60, transpositions=transpositions)
+    assert not timed_out
+    assert cost == bfs_cost(lake_map)
+    if path is not None:
+        assert_valid_path(lake_map, path, cost)
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (1, 40), (40, 1), (16, 16), (64, 48), (200, 200)])
+@pytest.mark.parametrize("holes", [0.0, 0.2, 0.4, 0.6, 1.0])
+def test_flood_fill_matches_scipy_labelling(monkeypatch, shape, holes):
+    ndimage = pytest.importorskip("scipy.ndimage")
+    passable = np.random.default_rng(shape[0] * shape[1]).random(shape) >= holes
+    expected, _ = ndimage.label(passable)
+    # the run-hooking fallback used without scipy
+    monkeypatch.setattr(maps, "ndimage", None)
+    labels = maps.label_components(passable)
+    assert np.array_equal(labels < 0, ~passable)
+    # the same partition: labels map one to one onto scipy's
+    pairs = np.unique(np.stack([labels[passable], expected[passable]]), axis=1)
+    assert len(np.unique(pairs[0])) == len(np.unique(pairs[1])) == pairs.shape[1]
+    for start in [(0, 0), (shape[0] - 1, shape[1] - 1), (shape[0] // 2, shape[1] // 2)]:
+        filled = maps.flood_fill(passable, start)
+        assert np.array_equal(filled, (expected == expected[start]) & passable[start])
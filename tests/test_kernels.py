@@ -0,0 +1,91 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import numpy as np
+import pytest
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TESTS)
+sys.path.insert(0, os.path.join(ROOT, "tsp", "common"))
+sys.path.insert(0, os.path.join(ROOT, "tsp", "Simulated_Annealing"))
+
+from kernels import Annealer, KernelMove, MOVE_KINDS  # noqa: E402
+from moves import make_move  # noqa: E402
+from schedules import make_schedule  # noqa: E402
+from tour import Tour  # noqa: E402
+
+
+def random_instance(n, seed):
+    rng = np.random.default_rng(seed)
+    points = rng.random((n, 2)) * 1000
+    # rounded distances so equal-delta ties actually occur
+    return np.rint(np.hypot(*(points[:, None, :] - points[None, :, :]).transpose(2, 0, 1)))
+
+
+@pytest.mark.parametrize("move", sorted(MOVE_KINDS))
+def test_kernel_descent_matches_operator(move):
+    dist = random_instance(60, seed=1)
+    operator = make_move(move, dist, 8)
+    kernel = KernelMove(operator)
+    order = np.random.default_rng(2).permutation(len(dist))
+    expected, actual = Tour(order), Tour(order)
+    steps = 0
+    while True:
+        best = operator.best_move(expected)
+        found = kernel.best_move(actual)
+        assert (found is None) == (best is None)
+        assert kernel.evaluations == operator.evaluations
+        if best is None:
+            break
+        assert tuple(found[0]) == tuple(best[0])
+        assert found[1] == pytest.approx(best[1])
+        operator.apply(expected, best[0])
+        kernel.apply(actual, found[0])
+        assert actual.tolist() == expected.tolist()
+        steps += 1
+    assert steps > 0
+
+
+@pytest.mark.parametrize("move", sorted(MOVE_KINDS))
+def test_annealer_keeps_a_valid_tour(move):
+    dist = random_instance(40, seed=3)
+    operator = make_move(move, dist, 8)
+    random.seed(0)
+    tour = Tour(np.random.default_rng(4).permutation(len(dist)))
+    length = tour.length(dist)
+    annealer = Annealer(move, tour, dist, operator.neighbors, make_schedule("geometric", 100, 500, 0.99),
+                        length, 5)
+    # run() returns at every new best tour, as the anytime loop expects
+    while annealer.iteration < 500:
+        annealer.run(500)
+    assert tour.validate(len(dist))
+    assert annealer.lengths[0] == pytest.approx(tour.length(dist))
+    assert annealer.best_length <= length
+
+
+def anneal_trajectory(move, iterations=2000):
+    """(iteration, best length, tour) at every return of a seeded Annealer.run."""
+    dist = random_instance(40, seed=3)
+    operator = make_move(move, dist, 8)
+    tour = Tour(np.random.default_rng(4).permutation(len(dist)))
+    annealer = Annealer(move, tour, dist, operator.neighbors, make_schedule("geometric", 100, iterations, 0.99),
+                        tour.length(dist), 5)
+    trajectory = []
+    while annealer.iteration < iterations:
+        annealer.run(iterations)
+        trajectory.append([annealer.iteration, annealer.best_length, tour.tolist()])
+    return trajectory
+
+
+@pytest.mark.parametrize("move", sorted(MOVE_KINDS))
+def test_compiled_annealer_matches_python_fallback(move):
+    pytest.importorskip("numba")
+    # the same kernels run as plain Python when numba cannot be imported
+    script = (f"import sys; sys.modules['numba'] = None; sys.path.insert(0, {TESTS!r}); "
+              f"import json, test_kernels; print(json.dumps(test_kernels.anneal_trajectory({move!r})))")
+    fallback = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    trajectory = anneal_trajectory(move)
+    assert len(trajectory) > 1
+    assert trajectory == json.loads(fallback.stdout)
@@ -0,0 +1,37 @@
+import os
+import random
+import sys
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "tsp", "common"))
+sys.path.insert(0, os.path.join(ROOT, "tsp", "Hill Climbing"))
+
+from Problem import ProblemInstance  # noqa: E402
+from lin_kernighan import lin_kernighan  # noqa: E402
+from tsplib import euc_2d  # noqa: E402
+
+
+def write_instance(path, n, seed):
+    coords = np.random.default_rng(seed).integers(0, 1000, size=(n, 2))
+    lines = ["NAME: random", "TYPE: TSP", f"DIMENSION: {n}", "EDGE_WEIGHT_TYPE: EUC_2D", "NODE_COORD_SECTION"]
+    lines += [f"{i + 1} {x} {y}" for i, (x, y) in enumerate(coords)]
+    path.write_text("\n".join(lines + ["EOF", ""]))
+    return coords
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("start, kicks", [("random", 0), ("greedy", 0), ("random", 50)])
+@pytest.mark.parametrize("distance_mode", ["matrix", "lazy"])
+def test_tour_is_a_permutation_with_the_reported_length(tmp_path, seed, start, kicks, distance_mode):
+    coords = write_instance(tmp_path / "random.tsp", 80, seed)
+    problem = ProblemInstance(str(tmp_path / "random.tsp"), distance_mode=distance_mode)
+    random.seed(seed)
+    tour, length, convergence = lin_kernighan(problem, kicks=kicks, start=start)
+    assert sorted(tour) == list(range(len(coords)))
+    # recomputed from the coordinates, independently of the distance matrix
+    closed = coords[np.append(tour, tour[0])]
+    assert length == pytest.approx(euc_2d(closed[:-1], closed[1:]).sum())
+    assert convergence[-1] == pytest.approx(length)
+    assert np.all(np.diff(convergence) < 0)
@@ -0,0 +1,47 @@
+import os
+import sys
+import warnings
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "frozen_lake", "common"))
+sys.path.insert(0, os.path.join(ROOT, "frozen_lake", "BNB"))
+
+from maps import LakeMap, generate_map  # noqa: E402
+from mdp import REFERENCE_SOLVERS, SOLVERS, compile_mdp, solve  # noqa: E402
+
+# gym's default 4x4 map
+DESC_4X4 = ["SFFF", "FHFH", "FFFH", "HFFG"]
+
+
+def test_default_4x4_success_probability():
+    mdp = compile_mdp(LakeMap.from_desc(DESC_4X4))
+    _, _, _, success = solve(mdp)
+    assert success == pytest.approx(0.8235, abs=1e-4)
+
+
+def test_gym_env_compiles_to_the_same_success_probability():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        gym = pytest.importorskip("gym")
+    env = gym.make("FrozenLake-v1", desc=DESC_4X4, is_slippery=True)
+    _, _, _, success = solve(compile_mdp(env))
+    assert success == pytest.approx(0.8235, abs=1e-4)
+
+
+@pytest.mark.parametrize("size, seed", [(4, None), (8, 0), (8, 1), (12, 2)])
+def test_solvers_agree(size, seed):
+    if seed is None:
+        lake_map = LakeMap.from_desc(DESC_4X4)
+    else:
+        np.random.seed(seed)
+        lake_map = generate_map(size)
+    mdp = compile_mdp(lake_map)
+    results = {method: solve(mdp, method) for method in {**SOLVERS, **REFERENCE_SOLVERS}}
+    values, _, _, success = results["policy_iteration"]
+    assert 0 < success <= 1
+    for method, (other_values, _, _, other_success) in results.items():
+        # value iteration and prioritized sweeping stop within tol per backup, not exactly
+        assert other_values == pytest.approx(values, abs=1e-5), method
+        assert other_success == pytest.approx(success, abs=1e-5), method
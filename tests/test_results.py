@@ -0,0 +1,51 @@
+import json
+import multiprocessing
+import os
+import sys
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "common"))
+
+from results import ResultsStore, load_results, log_performance  # noqa: E402
+
+RUNS = 50
+
+
+def log_runs(directory, writer):
+    for run in range(RUNS):
+        log_performance(directory, "writer", writer * RUNS + run, run * 0.5, writer + run,
+                        path=f"{writer},{run}", status="ok" if run % 2 else "time_limit", seed=writer)
+
+
+def test_concurrent_writers_round_trip(tmp_path):
+    directory = str(tmp_path)
+    writers = 4
+    # pool workers leave through os._exit; the store's finalizer still flushes them
+    pool = multiprocessing.get_context("fork").Pool(writers)
+    pool.starmap(log_runs, [(directory, writer) for writer in range(writers)])
+    pool.close()
+    pool.join()
+    store = ResultsStore(directory, buffer_rows=7)
+    for run in range(RUNS):
+        store.append("store", run, None, "Timeout", convergence_point=run, schedule="geometric")
+    store.flush()
+
+    results = load_results(directory)
+    assert not [name for name in os.listdir(directory) if name.startswith(".")]
+    assert len(results) == writers * RUNS + RUNS
+
+    logged = results[results["Algorithm"] == "writer"].sort_values("Run")
+    assert logged["Run"].tolist() == list(range(writers * RUNS))
+    writer, run = np.divmod(logged["Run"].to_numpy(), RUNS)
+    assert np.array_equal(logged["Cost"].to_numpy(), writer + run)
+    assert np.array_equal(logged["TimeTaken"].to_numpy(), run * 0.5)
+    assert logged["Path"].tolist() == [f"{w},{r}" for w, r in zip(writer, run)]
+    assert logged["Status"].tolist() == ["ok" if r % 2 else "time_limit" for r in run]
+    assert [json.loads(params) for params in logged["Params"]] == [{"seed": int(w)} for w in writer]
+
+    stored = results[results["Algorithm"] == "store"].sort_values("Run")
+    assert stored["Run"].tolist() == list(range(RUNS))
+    assert stored["TimeTaken"].isna().all() and stored["Cost"].isna().all()
+    assert stored["ConvergencePoint"].tolist() == list(range(RUNS))
+    assert set(stored["Params"]) == {json.dumps({"schedule": "geometric"})}
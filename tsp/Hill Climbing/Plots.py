@@ -1,30 +1,17 @@
+import os
+import sys
 from matplotlib import pyplot as plt
 import numpy as np
 import pandas as pd
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from tsplib import read_tsplib
+from cache import InstanceCache
 
-def getPoints(name_tsp):
-    with open(name_tsp) as f_o:
-            data= f_o.read()
-            lines = data.splitlines()
-    # store metadata set information 
-    name = lines[0].split(' ')[1]
-        # here we expect the name of the problem
-
-    nPoints =  np.int(lines[3].split(' ')[1])
-        # here we expect the number of points in the considered instance
-        
-#     best_sol = np.float(lines[5].split(' ')[1])
-        # here the lenght of the best solution
-        
-        
-        # read all data points and store them 
-    points = np.zeros((nPoints, 3)) # this is the structure where we will store the pts data 
-    for i in range(nPoints):
-        line_i = lines[7 + i].split(' ')
-        points[i, 0] = int(line_i[0])
-        points[i, 1] = float(line_i[1])
-        points[i, 2] = float(line_i[2])
-    return points
+def getPoints(name_tsp, cache_dir=None):
+    """(n, 3) array of node id, x, y read from a TSPLIB file (or its cache entry)."""
+    if cache_dir is not None:
+        return InstanceCache(cache_dir).load_instance(name_tsp)[1].points
+    return read_tsplib(name_tsp).points
 
 def plotPoints(points, nPoints):
     plt.figure(figsize=(8, 8))
@@ -1,51 +1,106 @@
+import os
+import sys
 import numpy as np
+from collections import OrderedDict
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from neighborhood import row_blocks
+from tour import Tour
+from tsplib import read_tsplib, euc_2d
+from cache import InstanceCache
+from bounds import held_karp_bound
+from spatial import PLANAR_TYPES, make_spatial_index
 
 class ProblemInstance:
     
-    def __init__(self, name_tsp):
+    def __init__(self, name_tsp, distance_mode="matrix", dist_dtype=np.float64, cache_dir=None):
+        """`distance_mode` is "matrix" for a dense n x n table or "lazy" to keep
+        only coordinates and compute distances on demand (huge instances).
+        `dist_dtype` can be np.int32 to halve the dense matrix's memory.
+        With `cache_dir` the parsed file and the matrix come from (and go to)
+        an `InstanceCache` there, memory-mapped read-only."""
         self.exist_opt = False
+        self.distance_mode = distance_mode
+        self.dist_dtype = dist_dtype
         self.optimal_tour = None
         self.dist_matrix = None
+        self.bound = None
+        self._spatial_index = None
 
-        # read raw data
         self.file_name = name_tsp
-        file_object = open(self.file_name)
-        data = file_object.read()
-        file_object.close()
-        self.lines = data.splitlines()
+        self.cache = InstanceCache(cache_dir) if cache_dir is not None else None
+        if self.cache is not None:
+            self.digest, self.instance = self.cache.load_instance(self.file_name)
+        else:
+            self.digest, self.instance = None, read_tsplib(self.file_name)
 
         # store data set information
-        # ciao brites
-        self.name = self.lines[0].split(': ')[1]
-        self.nPoints = int(self.lines[3].split(': ')[1])
-        self.best_sol = float(self.lines[5].split(': ')[1])
-
-        # read all data points and store them
-        self.points = np.zeros((self.nPoints, 3))
-        for i in range(self.nPoints):
-            
-            line_i = self.lines[7 + i].split(' ')
-#             print(line_i)
-            self.points[i, 0] = int(line_i[0])
-            self.points[i, 1] = line_i[1]
-            self.points[i, 2] = line_i[2]
-        self.create_dist_matrix();
-            
+        self.name = self.instance.name
+        self.nPoints = self.instance.dimension
+        self.best_sol = self.instance.best_known
+        self.edge_weight_type = self.instance.edge_weight_type
+
+        # id, x, y per city; all zero coordinates for EXPLICIT files without display data
+        self.points = self.instance.points
+        self.create_dist_matrix()
+
     def create_dist_matrix(self):
-        self.dist_matrix = np.zeros((self.nPoints, self.nPoints))
+        metric = self.instance.metric
+        if metric is None:
+            # EXPLICIT weights are already a full matrix, whatever the mode
+            weights = self.instance.weights
+            self.dist_matrix = weights if weights.dtype == self.dist_dtype else weights.astype(self.dist_dtype)
+            return
+
+        if self.distance_mode == "lazy":
+            self.dist_matrix = LazyDistanceMatrix(self.points[:, 1:3], self.dist_dtype, metric=metric)
+            return
+        if self.distance_mode != "matrix":
+            raise ValueError(f"Unknown distance_mode '{self.distance_mode}'")
+
+        shape = (self.nPoints, self.nPoints)
+        if self.cache is not None:
+            self.dist_matrix = self.cache.dist_matrix(self.digest, self.dist_dtype, shape, self.fill_dist_matrix)
+        else:
+            self.dist_matrix = np.empty(shape, dtype=self.dist_dtype)
+            self.fill_dist_matrix(self.dist_matrix)
+
+    @property
+    def spatial_index(self):
+        """k-nearest / radius index over the coordinates, built on first use;
+        None for metrics the planar coordinates do not rank correctly."""
+        if self._spatial_index is None and self.edge_weight_type in PLANAR_TYPES:
+            self._spatial_index = make_spatial_index(self.points[:, 1:3])
+        return self._spatial_index
+
+    def fill_dist_matrix(self, out):
+        """Writes the coordinate metric's distances into `out`, a block of rows at a time."""
+        metric = self.instance.metric
+        coords = self.points[:, 1:3]
+        for rows in row_blocks(self.nPoints):
+            out[rows] = metric(coords[rows, None, :], coords[None, :, :])
 
-        for i in range(self.nPoints):
-            for j in range(i, self.nPoints):
-                self.dist_matrix[i, j] = distance_euc(self.points[i][1:3], self.points[j][1:3])
-        self.dist_matrix += self.dist_matrix.T
-        
     def GAP(self, found):
+        if self.best_sol is None:
+            return None
         return np.round(
             ((found - self.best_sol) / self.best_sol) * 100, 3)
 
+    def lower_bound(self, **kwargs):
+        """Held-Karp lower bound on the optimal length, computed once (see
+        `bounds.held_karp_bound` for the keyword arguments)."""
+        if self.bound is None:
+            self.bound = held_karp_bound(self.dist_matrix, **kwargs)
+        return self.bound
+
+    def BoundGAP(self, found):
+        """Percent above the lower bound, an upper estimate of the true gap that
+        needs no BEST_KNOWN value."""
+        bound = self.lower_bound()
+        return np.round(((found - bound) / bound) * 100, 3)
+
     def ValidateSolution(self, path):
-        return min(path) == 0 and max(path) == self.nPoints-1 and len(path) == len(set(path)) \
-        and sum(path) == sum(i for i in range(self.nPoints))
+        tour = path if isinstance(path, Tour) else Tour(path)
+        return tour.validate(self.nPoints)
 
 
 def compute_length(solution, dist_matrix):
@@ -60,8 +115,46 @@ def compute_length(solution, dist_matrix):
 
 
 def distance_euc(point_i, point_j):
-    rounding = 0
-    x_i, y_i = point_i[0], point_i[1]
-    x_j, y_j = point_j[0], point_j[1]
-    distance = np.sqrt((x_i - x_j) ** 2 + (y_i - y_j) ** 2)
-    return round(distance, rounding)
\ No newline at end of file
+    return float(euc_2d(point_i[:2], point_j[:2]))
+
+
+class LazyDistanceMatrix:
+    """Distance "matrix" computed from coordinates on demand.
+
+    Supports the indexing the solvers use on a dense matrix: d[i, j] with
+    scalars or broadcastable index arrays, and d[rows] for whole rows. Single
+    rows are kept in a small LRU cache, since candidate scans revisit them.
+    """
+
+    def __init__(self, coords, dtype=np.float64, cache_rows=256, metric=euc_2d):
+        self.coords = np.ascontiguousarray(coords, dtype=float)
+        self.metric = metric
+        self.dtype = np.dtype(dtype)
+        self.shape = (len(self.coords), len(self.coords))
+        self.ndim = 2
+        self.cache_rows = cache_rows
+        self._rows = OrderedDict()
+
+    def __len__(self):
+        return self.shape[0]
+
+    def row(self, i):
+        cached = self._rows.get(i)
+        if cached is not None:
+            self._rows.move_to_end(i)
+            return cached
+        cached = self.metric(self.coords[i], self.coords).astype(self.dtype)
+        self._rows[i] = cached
+        if len(self._rows) > self.cache_rows:
+            self._rows.popitem(last=False)
+        return cached
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            i, j = key
+            if np.ndim(i) == 0 and np.ndim(j) == 0 and int(i) in self._rows:
+                return self._rows[int(i)][j]
+            return self.metric(self.coords[i], self.coords[j]).astype(self.dtype)[()]
+        if np.ndim(key) == 0 and not isinstance(key, slice):
+            return self.row(int(key))
+        return self.metric(self.coords[key][..., None, :], self.coords).astype(self.dtype)
\ No newline at end of file
@@ -0,0 +1,75 @@
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from neighborhood import swap_deltas, row_blocks, BLOCK_SIZE
+
+
+class SwapDeltaEvaluator:
+    """Scores every position swap of a tour without building the neighbours.
+
+    Edge k of a tour is (tour[k], tour[k + 1]); edge n - 1 is the closing edge
+    back to tour[0]. Swap deltas come from `neighborhood.swap_deltas`. The
+    max-edge term of the swap score is found from the largest few open-path
+    edges, since a swap touches at most four of them.
+    """
+
+    TOP_EDGES = 5
+
+    def __init__(self, dist_matrix, block_size=BLOCK_SIZE):
+        self.dist = dist_matrix
+        self.block_size = block_size
+        self.tour = None
+        self.n = 0
+        self.top_edges = []
+
+    def reset(self, tour):
+        """Binds the evaluator to `tour` and rebuilds its edge summary."""
+        self.tour = np.asarray(tour)
+        self.n = len(tour)
+        path_edges = self.dist[self.tour[:-1], self.tour[1:]]
+        order = np.argsort(-path_edges, kind="stable")[:self.TOP_EDGES]
+        self.top_edges = [(path_edges[k], k) for k in order]
+
+    def swap_max_edges(self, rows):
+        """Longest open-path edge (closing edge excluded) after each swap in `rows`."""
+        tour, d, n = self.tour, self.dist, self.n
+        i = np.arange(n)[rows][:, None]
+        j = np.arange(n)[None, :]
+        ti, pi, ni = tour[i], tour[i - 1], tour[(i + 1) % n]
+        tj, pj, nj = tour[j], tour[j - 1], tour[(j + 1) % n]
+        adjacent = j == i + 1
+
+        longest = np.where(i >= 1, d[pi, tj], -np.inf)
+        longest = np.maximum(longest, np.where(adjacent, d[tj, ti], d[tj, ni]))
+        longest = np.maximum(longest, np.where(adjacent, -np.inf, d[pj, ti]))
+        longest = np.maximum(longest, np.where(j < n - 1, d[ti, nj], -np.inf))
+
+        # longest surviving edge: first of the top edges not among i-1, i, j-1, j
+        found = np.zeros(longest.shape, dtype=bool)
+        for value, k in self.top_edges:
+            kept = ~found & (k != i - 1) & (k != i) & (k != j - 1) & (k != j)
+            longest = np.where(kept, np.maximum(longest, value), longest)
+            found |= kept
+        return longest
+
+    def best_swap(self, current_length, weight=0.01):
+        """Returns the swap (i, j) minimising length + weight * max_edge.
+
+        Candidates and tie-breaking follow `get_neighbors`' historical order:
+        1 <= i < j <= n - 1, first minimum wins. Returns None when there are
+        no candidates.
+        """
+        best = None
+        best_score = np.inf
+        for rows in row_blocks(self.n, self.block_size):
+            scores = current_length + swap_deltas(self.tour, self.dist, rows) \
+                + weight * self.swap_max_edges(rows)
+            if rows.start == 0:
+                scores[0] = np.inf
+            flat = int(np.argmin(scores))
+            score = scores.flat[flat]
+            if score < best_score:
+                best_score = score
+                best = (rows.start + flat // self.n, flat % self.n)
+        return best
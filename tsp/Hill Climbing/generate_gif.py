@@ -91,9 +91,10 @@ def generate_enhanced_gif(tour, points, output="hill_climb.gif"):
 
 if __name__ == "__main__":
     from Problem import ProblemInstance
+    from cache import DEFAULT_CACHE_DIR
     
     try:
-        problem = ProblemInstance("eil76.tsp")
+        problem = ProblemInstance("eil76.tsp", cache_dir=DEFAULT_CACHE_DIR)
         best_tour = [int(i) for i in np.loadtxt("best_tour.txt")]
         generate_enhanced_gif(best_tour, problem.points)
     except Exception as e:
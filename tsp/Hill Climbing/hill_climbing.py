@@ -1,131 +1,186 @@
 import numpy as np
-import random
-import threading
-import time
 import os
-from Problem import ProblemInstance, compute_length
-from utils import start_timer, stop_timer, log_performance, TimeoutException
-
-class Timeout:
-    def __init__(self, seconds):
-        self.seconds = seconds
-        self.timer = None
-
-    def handle_timeout(self):
-        raise TimeoutException()
-
-    def __enter__(self):
-        self.timer = threading.Timer(self.seconds, self.handle_timeout)
-        self.timer.start()
-        return self
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.timer:
-            self.timer.cancel()
-
-def heuristic(tour, dist_matrix):
-    total_length = compute_length(tour, dist_matrix)
-    max_edge = max(dist_matrix[tour[i]][tour[i+1]] for i in range(len(tour)-1))
-    return total_length + 0.01 * max_edge
-
-def hill_climb(problem, max_iter=10000):
-    n = problem.nPoints
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from Problem import ProblemInstance
+from delta import SwapDeltaEvaluator
+from moves import make_move
+from cache import DEFAULT_CACHE_DIR
+from multistart import multistart
+from bounds import target_length
+from construction import make_tour
+from anytime import Budget, Improvement, run_anytime
+from convergence import ConvergenceRecorder
+from kernels import KernelMove, resolve_backend
+from utils import log_performance
+
+def hill_climb_anytime(problem, budget=None, move=None, neighbors=10, target_gap=None, start="random",
+                       instrumentation=None, backend="python"):
+    """Anytime hill climbing: yields an `anytime.Improvement` for the start
+    tour and after every improving step, until a local optimum, the target
+    gap or the `budget` is reached; returns (iterations, evaluations).
+
+    With move=None every position swap is scored as originally, by length
+    plus 0.01 times the longest open-path edge, through
+    `delta.SwapDeltaEvaluator`; the best swap is kept if it shortens the tour.
+    Otherwise `move` names an operator from `moves.MOVES` and each step takes
+    its best improving candidate among the `neighbors` nearest cities.
+    With `target_gap` (percent) the descent stops as soon as the tour is that
+    close to the best known length, or to the lower bound without one.
+    `start` names the initial tour's construction in `construction.CONSTRUCTIONS`.
+    An `instrumentation.Instrumentation` times the start, neighbourhood
+    scan, move and length phases and counts evaluated, accepted and
+    rejected moves. With a `move`, `backend` picks the scan's implementation
+    from `kernels.BACKENDS`; "numba" compiles it over the same candidates in
+    the same order, so it takes the same steps as the Python operators.
+    """
+    budget = (budget or Budget(max_iter=10000)).start()
+    timed = instrumentation is not None and instrumentation.timers
+    if timed:
+        instrumentation.mark()
     dist_matrix = problem.dist_matrix
+    backend = resolve_backend(backend, dist_matrix)
+    n = problem.nPoints
 
-    def get_neighbors(tour):
-        neighbors = []
-        for i in range(1, n - 1):
-            for j in range(i + 1, n):
-                new_tour = tour.copy()
-                new_tour[i], new_tour[j] = new_tour[j], new_tour[i]
-                neighbors.append(new_tour)
-        return neighbors
-
-    current_tour = list(range(n))
-    random.shuffle(current_tour)
-
-    current_length = compute_length(current_tour, dist_matrix)
-    convergence = [current_length]
-
-    for iteration in range(max_iter):
-        neighbors = get_neighbors(current_tour)
-        if not neighbors:
+    current_tour = make_tour(start, problem)
+    current_length = current_tour.length(dist_matrix)
+    target = target_length(problem, target_gap) if target_gap is not None else None
+    evaluations = 0
+    if timed:
+        instrumentation.lap("start")
+    yield Improvement(current_tour.tolist(), current_length, 0, evaluations, budget.elapsed())
+
+    if move is not None:
+        operator = make_move(move, dist_matrix, neighbors, problem.spatial_index)
+        if backend == "numba":
+            operator = KernelMove(operator)
+        iteration = 0
+        while not budget.exhausted(iteration, operator.evaluations):
+            if target is not None and current_length <= target:
+                break
+            if timed:
+                instrumentation.mark()
+            evaluated = operator.evaluations
+            found = operator.best_move(current_tour)
+            iteration += 1
+            if instrumentation is not None:
+                instrumentation.moves(operator.evaluations - evaluated, found is not None)
+                if timed:
+                    instrumentation.lap("neighbourhood")
+            if found is None:
+                break
+            operator.apply(current_tour, found[0])
+            if timed:
+                instrumentation.lap("move")
+            current_length = current_tour.length(dist_matrix)
+            if timed:
+                instrumentation.lap("length")
+            yield Improvement(current_tour.tolist(), current_length, iteration,
+                              operator.evaluations, budget.elapsed())
+        return iteration, operator.evaluations
+
+    evaluator = SwapDeltaEvaluator(dist_matrix)
+    iteration = 0
+    while not budget.exhausted(iteration, evaluations):
+        if target is not None and current_length <= target:
+            break
+        if timed:
+            instrumentation.mark()
+        evaluator.reset(current_tour.order)
+        best = evaluator.best_swap(current_length)
+        iteration += 1
+        evaluations += n * (n - 1) // 2
+        if timed:
+            instrumentation.lap("neighbourhood")
+        if best is None:
+            if instrumentation is not None:
+                instrumentation.moves(n * (n - 1) // 2)
             break
 
-        next_tour = min(neighbors, key=lambda t: heuristic(t, dist_matrix))
-        next_length = compute_length(next_tour, dist_matrix)
+        current_tour.swap(*best)
+        if timed:
+            instrumentation.lap("move")
+        next_length = current_tour.length(dist_matrix)
+        if timed:
+            instrumentation.lap("length")
+        if instrumentation is not None:
+            instrumentation.moves(n * (n - 1) // 2, next_length < current_length)
 
         if next_length < current_length:
-            current_tour = next_tour
             current_length = next_length
-            convergence.append(current_length)
+            yield Improvement(current_tour.tolist(), current_length, iteration, evaluations, budget.elapsed())
         else:
+            current_tour.swap(*best)
             break
-
-    return current_tour, current_length, convergence
+    return iteration, evaluations
+
+
+def hill_climb(problem, max_iter=10000, move=None, neighbors=10, target_gap=None, start="random",
+               time_limit=None, max_evals=None, callback=None, recorder=None, instrumentation=None,
+               backend="python"):
+    """Runs `hill_climb_anytime` to the end: (tour, length, convergence).
+
+    `time_limit` (seconds), `max_iter` and `max_evals` bound the run, which
+    then returns its best tour so far; `callback(improvement)` sees every
+    improvement and stops the run by returning True. The convergence is the
+    array of improving lengths, or the given `convergence.ConvergenceRecorder`.
+    `instrumentation` and `backend` are passed on to `hill_climb_anytime`.
+    """
+    budget = Budget(time_limit, max_iter, max_evals, check_every=1)
+    trace = recorder if recorder is not None else ConvergenceRecorder("improvement")
+    best, _, _ = run_anytime(
+        hill_climb_anytime(problem, budget, move, neighbors, target_gap, start, instrumentation, backend),
+        callback, trace)
+    return best.tour, best.length, trace if recorder is not None else trace.lengths()
 
 if __name__ == '__main__':
-    problem = ProblemInstance("eil76.tsp")
+    problem = ProblemInstance("eil76.tsp", cache_dir=DEFAULT_CACHE_DIR)
     runs = 5
-    timeout_seconds = 600  # 10 minutes
+    time_limit = 600  # 10 minutes per run, then the best tour so far is kept
+    workers = min(runs, os.cpu_count() or 1)
 
     if not os.path.exists("frames"):
         os.makedirs("frames")
 
-    best_overall_tour = None
-    best_overall_dist = float('inf')
+    best_overall = None
     all_times = []
 
-    for run in range(1, runs + 1):
+    print(f"\n--- Starting {runs} runs on {workers} worker(s) ---")
+    for result in multistart(hill_climb, problem, runs, workers=workers, time_limit=time_limit):
+        run = result["run"]
         try:
-            with Timeout(timeout_seconds):
-                print(f"\n--- Starting Run {run} ---")
-                start_time = start_timer()
-
-                current_tour, current_dist, convergence = hill_climb(problem)
-
-                elapsed = stop_timer(start_time)
-                all_times.append(elapsed)
-
-                if current_dist < best_overall_dist:
-                    best_overall_dist = current_dist
-                    best_overall_tour = current_tour
-                    np.savetxt("best_tour.txt", best_overall_tour, fmt='%d')
-
-                print(f"Run {run} completed:")
-                print(f"Distance: {current_dist:.2f}")
-                print(f"Time: {elapsed:.2f}s")
-                print(f"Convergence: {convergence[-1]:.2f}")
-
-                log_performance(
-                    filepath="results.csv",
-                    algorithm="HillClimbing",
-                    run_id=run,
-                    time_taken=elapsed,
-                    cost=current_dist,
-                    reward=1,
-                    convergence_point=convergence[-1],
-                    path=",".join(map(str, current_tour))
-                )
-        except TimeoutException:
-            print(f"Run {run} timed out after {timeout_seconds//60} minutes")
+            all_times.append(result["time"])
+
+            if best_overall is None or result["length"] < best_overall["length"]:
+                best_overall = result
+                np.savetxt("best_tour.txt", best_overall["tour"], fmt='%d')
+
+            stopped = result["time"] >= time_limit
+            print(f"Run {run} {'stopped at the time limit' if stopped else 'completed'} (seed {result['seed']}):")
+            print(f"Distance: {result['length']:.2f}")
+            print(f"Time: {result['time']:.2f}s")
+            print(f"Convergence: {result['convergence_point']:.2f}")
+
             log_performance(
-                filepath="results.csv",
+                filepath="results",
                 algorithm="HillClimbing",
                 run_id=run,
-                time_taken=timeout_seconds,
-                cost=-1,
-                reward=0,
-                convergence_point=-1,
-                path="None")
+                time_taken=result["time"],
+                cost=result["length"],
+                reward=1,
+                convergence_point=result["convergence_point"],
+                path=",".join(map(str, result["tour"])),
+                status="time_limit" if stopped else "ok",
+                seed=result["seed"]
+            )
         except Exception as e:
             print(f"An error occurred during Run {run}: {e}")
 
-    if best_overall_tour is not None:
+    if best_overall is not None:
         print("\n=== Best Solution ===")
-        print(f"Distance: {best_overall_dist:.2f}")
+        print(f"Distance: {best_overall['length']:.2f}")
         print(f"Average Time: {np.mean(all_times):.2f}s")
-        print(f"Best Tour: {best_overall_tour}")
-        print(f"Convergence: {convergence[-1]:.2f}")    
+        print(f"Best Tour: {best_overall['tour']}")
+        print(f"Convergence: {best_overall['convergence_point']:.2f}")
     else:
         print("\nNo valid solution found in any run!")
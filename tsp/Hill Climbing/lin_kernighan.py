@@ -0,0 +1,332 @@
+import numpy as np
+import random
+import os
+import sys
+from collections import deque
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from Problem import ProblemInstance
+from moves import IMPROVEMENT_TOL, nearest_neighbors
+from cache import DEFAULT_CACHE_DIR
+from multistart import multistart
+from bounds import target_length
+from construction import make_tour
+from anytime import Budget, Improvement, run_anytime
+from convergence import ConvergenceRecorder
+from utils import log_performance
+
+# cities spanned by a kick, so its repairs stay local
+KICK_SEGMENT = 50
+
+
+def _pair_distance(dist_matrix):
+    """d(a, b) -> Python number, without numpy scalar overhead on dense matrices."""
+    if isinstance(dist_matrix, np.ndarray):
+        return dist_matrix.item
+    return lambda a, b: float(dist_matrix[a, b])
+
+
+def _edge(a, b):
+    return (a, b) if a < b else (b, a)
+
+
+class LinKernighan:
+    """Lin-Kernighan style variable-depth search on a `tour.Tour`.
+
+    A move is a chain of 2-opt steps sharing the base city t1: breaking
+    (t1, t2) and adding (t2, t3) for a candidate neighbour t3 of t2 fixes
+    which tour neighbour t4 of t3 must go, and closing with (t4, t1) gives a
+    valid tour whose open edge (t1, t4) the next level breaks again. The
+    chain only goes on while its partial gain stays positive, never breaks
+    an edge it added nor adds one it broke, and is taken as soon as some
+    level closes into a shorter tour. The first levels try the
+    `breadth[level - 1]` best candidates, backtracking when they fail;
+    deeper levels only the best one, down to `max_depth`.
+
+    Cities whose tour edges did not change since their last failed search
+    keep their don't-look bit set and are skipped: `queue` holds the active
+    ones. Reversals flip the shorter side of the cycle, on the int32 arrays.
+    """
+
+    def __init__(self, tour, dist_matrix, neighbors, max_depth=10, breadth=(5, 3, 1)):
+        self.tour = tour
+        self.n = len(tour)
+        self.dist = _pair_distance(dist_matrix)
+        self.neighbors = neighbors.tolist()
+        rows = np.arange(self.n)[:, None]
+        self.neighbor_dist = np.asarray(dist_matrix[rows, neighbors], dtype=float).tolist()
+        self.max_depth = max_depth
+        self.breadth = tuple(breadth)
+        self.queue = deque()
+        self.active = bytearray(self.n)
+        self.evaluations = 0
+        self._added = set()
+        self._removed = set()
+        self.activate(tour.tolist())
+
+    def activate(self, cities):
+        """Clears the don't-look bits of `cities`, queueing them for a search."""
+        active, queue = self.active, self.queue
+        for city in cities:
+            if not active[city]:
+                active[city] = 1
+                queue.append(city)
+
+    def _succ(self, city):
+        return self.tour.order.item((self.tour.pos.item(city) + 1) % self.n)
+
+    def _pred(self, city):
+        return self.tour.order.item(self.tour.pos.item(city) - 1)
+
+    def _reverse_path(self, a, b):
+        """Reverses the path from city a forward to city b, or the rest of the
+        cycle instead when that is shorter; both give the same tour."""
+        order, pos, n = self.tour.order, self.tour.pos, self.n
+        i, j = pos.item(a), pos.item(b)
+        inner = (j - i) % n + 1
+        if 2 * inner > n:
+            i, j, inner = (j + 1) % n, (i - 1) % n, n - inner
+        if inner < 2:
+            return
+        if i <= j:
+            self.tour.reverse(i, j)
+            return
+        index = (i + np.arange(inner)) % n
+        order[index] = order[index[::-1]]
+        pos[order[index]] = index
+
+    def _make_2opt(self, a, b, c, d):
+        """Replaces tour edges (a, b) and (c, d) by (a, c) and (b, d)."""
+        if self._succ(a) == b:
+            self._reverse_path(b, c)
+        else:
+            self._reverse_path(a, d)
+
+    def _search(self, t1, t2, gain, level, chain):
+        d = self.dist
+        # orientation: which tour neighbour of t3 closes the tour through t1
+        t2_first = self._succ(t2) == t1
+        closing, closing_gain = None, IMPROVEMENT_TOL
+        candidates = []
+        for t3, d23 in zip(self.neighbors[t2], self.neighbor_dist[t2]):
+            partial = gain - d23
+            if partial <= IMPROVEMENT_TOL:
+                break
+            t4 = self._succ(t3) if t2_first else self._pred(t3)
+            if t3 == t1 or t4 == t2 or _edge(t2, t3) in self._removed or _edge(t3, t4) in self._added:
+                continue
+            self.evaluations += 1
+            d34 = d(t3, t4)
+            closed = partial + d34 - d(t4, t1)
+            if closed > closing_gain:
+                closing, closing_gain = (t3, t4), closed
+            candidates.append((partial + d34, t3, t4))
+
+        if closing is not None:
+            t3, t4 = closing
+            self._make_2opt(t2, t1, t3, t4)
+            chain.extend(closing)
+            return closing_gain
+        if level >= self.max_depth:
+            return 0.0
+        candidates.sort(reverse=True)
+        width = self.breadth[level - 1] if level <= len(self.breadth) else 1
+        for partial, t3, t4 in candidates[:width]:
+            self._make_2opt(t2, t1, t3, t4)
+            added, removed = _edge(t2, t3), _edge(t3, t4)
+            self._added.add(added)
+            self._removed.add(removed)
+            gained = self._search(t1, t4, partial, level + 1, chain)
+            self._added.discard(added)
+            self._removed.discard(removed)
+            if gained:
+                chain.extend((t3, t4))
+                return gained
+            self._make_2opt(t2, t3, t1, t4)
+        return 0.0
+
+    def improve(self, t1):
+        """Searches for an improving move from t1 and makes it: (gain, cities
+        whose edges changed), or (0.0, None) if there is none."""
+        for t2 in (self._succ(t1), self._pred(t1)):
+            chain = [t1, t2]
+            self._removed.add(_edge(t1, t2))
+            gain = self._search(t1, t2, self.dist(t1, t2), 1, chain)
+            self._removed.clear()
+            if gain:
+                return gain, chain
+        return 0.0, None
+
+    def step(self):
+        """Pops the next active city and improves from it; returns the gain.
+        The city and every endpoint of a changed edge become active again."""
+        t1 = self.queue.popleft()
+        self.active[t1] = 0
+        gain, chain = self.improve(t1)
+        if chain is not None:
+            self.activate(chain)
+        return gain
+
+    def kick(self):
+        """Double-bridge kick within KICK_SEGMENT consecutive cities: exchanges
+        two adjacent segments there and activates the six endpoints. Returns
+        the length change."""
+        order, n, d = self.tour.order, self.n, self.dist
+        i = random.randrange(n - 3)
+        span = min(KICK_SEGMENT, n - 1 - i)
+        j, k = sorted(random.sample(range(i + 1, i + span + 1), 2))
+        a, a_next, b, b_next = order.item(i), order.item(i + 1), order.item(j), order.item(j + 1)
+        c, c_next = order.item(k), order.item((k + 1) % n)
+        delta = d(a, b_next) + d(c, a_next) + d(b, c_next) - d(a, a_next) - d(b, b_next) - d(c, c_next)
+        self.tour.exchange_segments(i, j, k)
+        self.activate((a, a_next, b, b_next, c, c_next))
+        return delta
+
+
+def lin_kernighan_anytime(problem, budget=None, neighbors=8, max_depth=10, breadth=(5, 3, 1), kicks=0,
+                          target_gap=None, start="greedy", instrumentation=None):
+    """Anytime Lin-Kernighan search: yields an `anytime.Improvement` for the
+    start tour, for the first local optimum and for every better tour found
+    by the kicks, until `kicks` are done, the target gap or the `budget` is
+    reached; returns (iterations, evaluations).
+
+    Each iteration searches from one active city with `LinKernighan` over
+    its `neighbors` nearest cities. After the first local optimum, iterated
+    LK applies up to `kicks` local double-bridge kicks (kicks=None: until the
+    budget runs out), each followed by a repair of the kicked area; a kick
+    is kept unless it leaves the tour longer. With `target_gap` (percent)
+    the run stops once the best tour is that close to the best known length,
+    or to the lower bound without one. `start` names the initial tour's
+    construction in `construction.CONSTRUCTIONS`. An
+    `instrumentation.Instrumentation` times the start, descent and kick
+    phases and counts evaluated and improving moves, kicks and kept kicks.
+    """
+    budget = (budget or Budget()).start()
+    if kicks is None and budget.time_limit is None and budget.max_iter is None \
+            and budget.max_evals is None:
+        raise ValueError("kicks=None needs a time, iteration or evaluation limit")
+    timed = instrumentation is not None and instrumentation.timers
+    if timed:
+        instrumentation.mark()
+    dist_matrix = problem.dist_matrix
+    n = problem.nPoints
+
+    tour = make_tour(start, problem)
+    best_length = tour.length(dist_matrix)
+    target = target_length(problem, target_gap) if target_gap is not None else None
+    search = LinKernighan(tour, dist_matrix, nearest_neighbors(dist_matrix, neighbors, problem.spatial_index),
+                          max_depth, breadth)
+    if timed:
+        instrumentation.lap("start")
+    yield Improvement(tour.tolist(), best_length, 0, 0, budget.elapsed())
+
+    iteration = 0
+    length = best_length
+    best_order, best_pos = tour.order.copy(), tour.pos.copy()
+    kick = 0
+    while True:
+        while search.queue and not budget.exhausted(iteration, search.evaluations):
+            iteration += 1
+            evaluated = search.evaluations
+            gain = search.step()
+            length -= gain
+            if instrumentation is not None:
+                instrumentation.moves(search.evaluations - evaluated, gain > 0)
+        if timed:
+            instrumentation.lap("descent")
+
+        if length < best_length - IMPROVEMENT_TOL:
+            # exact length, so rounding cannot build up over many moves
+            length = best_length = tour.length(dist_matrix)
+            np.copyto(best_order, tour.order)
+            np.copyto(best_pos, tour.pos)
+            if kick and instrumentation is not None:
+                instrumentation.count("kept")
+            yield Improvement(best_order.tolist(), best_length, iteration, search.evaluations,
+                              budget.elapsed())
+            if timed:
+                instrumentation.mark()
+        elif length <= best_length + IMPROVEMENT_TOL:
+            np.copyto(best_order, tour.order)
+            np.copyto(best_pos, tour.pos)
+        else:
+            np.copyto(tour.order, best_order)
+            np.copyto(tour.pos, best_pos)
+            length = best_length
+
+        if search.queue or budget.exhausted(iteration, search.evaluations) \
+                or (target is not None and best_length <= target) \
+                or (kicks is not None and kick >= kicks) or n < 8:
+            break
+        kick += 1
+        length += search.kick()
+        if instrumentation is not None:
+            instrumentation.count("kicks")
+            if timed:
+                instrumentation.lap("kick")
+    return iteration, search.evaluations
+
+
+def lin_kernighan(problem, max_iter=None, neighbors=8, max_depth=10, breadth=(5, 3, 1), kicks=0,
+                  target_gap=None, start="greedy", time_limit=None, max_evals=None, callback=None,
+                  recorder=None, instrumentation=None):
+    """Runs `lin_kernighan_anytime` to the end: (tour, length, convergence).
+
+    `time_limit` (seconds), `max_iter` and `max_evals` bound the run, which
+    then returns its best tour so far; `callback(improvement)` sees every
+    improvement and stops the run by returning True. The convergence is the
+    array of improving lengths, or the given `convergence.ConvergenceRecorder`.
+    """
+    budget = Budget(time_limit, max_iter, max_evals)
+    trace = recorder if recorder is not None else ConvergenceRecorder("improvement")
+    best, _, _ = run_anytime(
+        lin_kernighan_anytime(problem, budget, neighbors, max_depth, breadth, kicks, target_gap, start,
+                              instrumentation),
+        callback, trace)
+    return best.tour, best.length, trace if recorder is not None else trace.lengths()
+
+if __name__ == '__main__':
+    problem = ProblemInstance("eil76.tsp", cache_dir=DEFAULT_CACHE_DIR)
+    runs = 5
+    time_limit = 60  # iterated LK keeps kicking until then
+    workers = min(runs, os.cpu_count() or 1)
+
+    best_overall = None
+    all_times = []
+
+    print(f"\n--- Starting {runs} runs on {workers} worker(s) ---")
+    for result in multistart(lin_kernighan, problem, runs, workers=workers, time_limit=time_limit,
+                             kicks=None, target_gap=0.0):
+        run = result["run"]
+        try:
+            all_times.append(result["time"])
+
+            if best_overall is None or result["length"] < best_overall["length"]:
+                best_overall = result
+                np.savetxt("best_lk_tour.txt", best_overall["tour"], fmt='%d')
+
+            stopped = result["time"] >= time_limit
+            print(f"Run {run} {'stopped at the time limit' if stopped else 'completed'} (seed {result['seed']}):")
+            print(f"Distance: {result['length']:.2f}")
+            print(f"Gap: {problem.GAP(result['length'])}%")
+            print(f"Time: {result['time']:.2f}s")
+
+            log_performance(
+                filepath="lk_results",
+                algorithm="LinKernighan",
+                run_id=run,
+                time_taken=result["time"],
+                cost=result["length"],
+                convergence_point=result["convergence_point"],
+                path=",".join(map(str, result["tour"])),
+                status="time_limit" if stopped else "ok",
+                seed=result["seed"]
+            )
+        except Exception as e:
+            print(f"An error occurred during Run {run}: {e}")
+
+    if best_overall is not None:
+        print("\n=== Best Solution ===")
+        print(f"Distance: {best_overall['length']:.2f}")
+        print(f"Average Time: {np.mean(all_times):.2f}s")
+    else:
+        print("\nNo valid solution found in any run!")
@@ -1,7 +1,10 @@
 import matplotlib.pyplot as plt
-import pandas as pd
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from results import load_results
 
-data = pd.read_csv("results.csv")
+data = load_results("results", legacy_csv="results.csv")
 filtered = data[data["TimeTaken"] < 600]
 
 plt.plot(filtered["Run"], filtered["TimeTaken"], marker='o', label='Time (s)')
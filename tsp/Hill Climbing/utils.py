@@ -1,6 +1,8 @@
 import time
-import csv
 import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from results import log_performance
 
 class TimeoutException(Exception):
     pass
@@ -12,32 +14,3 @@ def start_timer():
 def stop_timer(start_time):
     """Returns elapsed time in seconds"""
     return time.perf_counter() - start_time
-
-def log_performance(filepath, algorithm, run_id, time_taken, cost, reward, convergence_point, path):
-    """Logs performance metrics to CSV file"""
-    file_exists = os.path.isfile(filepath)
-    
-    with open(filepath, 'a', newline='') as csvfile:
-        fieldnames = [
-            'Algorithm', 
-            'Run', 
-            'TimeTaken', 
-            'Cost', 
-            'Reward', 
-            'ConvergencePoint', 
-            'Path'
-        ]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-        if not file_exists:
-            writer.writeheader()
-
-        writer.writerow({
-            'Algorithm': algorithm,
-            'Run': run_id,
-            'TimeTaken': f"{float(time_taken):.6f}",
-            'Cost': f"{float(cost):.2f}" if str(cost) != 'None' else '-1',
-            'Reward': int(reward),
-            'ConvergencePoint': f"{float(convergence_point):.2f}" if str(convergence_point) != 'None' else '-1',
-            'Path': str(path)
-        })
\ No newline at end of file
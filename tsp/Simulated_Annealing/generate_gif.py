@@ -86,10 +86,11 @@ def generate_gif(tour, points, output="simulated_annealing.gif"):
 
 if __name__ == "__main__":
     from Problem import ProblemInstance
+    from cache import DEFAULT_CACHE_DIR
     import numpy as np
 
     try:
-        problem = ProblemInstance("eil76.tsp")
+        problem = ProblemInstance("eil76.tsp", cache_dir=DEFAULT_CACHE_DIR)
         best_tour = [int(i) for i in np.loadtxt("best_sa_tour.txt")]
         generate_gif(best_tour, problem.points)
     except Exception as e:
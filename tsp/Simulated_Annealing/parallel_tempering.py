@@ -0,0 +1,233 @@
+import math
+import multiprocessing
+import os
+import random
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from Problem import ProblemInstance
+from moves import make_move
+from tour import Tour
+from cache import DEFAULT_CACHE_DIR
+from multistart import SharedProblem
+from bounds import target_length
+from construction import make_tour
+from utils import start_timer, stop_timer, log_performance
+
+
+class _Replicas:
+    """The replicas one process holds: tour, length and best tour so far of each."""
+
+    def __init__(self, problem, move, neighbors, states):
+        self.operator = make_move(move, problem.dist_matrix, neighbors, problem.spatial_index)
+        self.states = {k: [Tour(order), length, order.copy(), length] for k, (order, length) in states.items()}
+
+    def sweep(self, jobs, steps):
+        """`steps` Metropolis moves for each (replica, temperature, seed) job;
+        returns (length, best length, accepted moves) per job."""
+        return [self._sweep(self.states[k], temp, steps, seed) for k, temp, seed in jobs]
+
+    def _sweep(self, state, temp, steps, seed):
+        random.seed(seed)
+        operator = self.operator
+        tour, length, best_order, best_length = state
+        accepted = 0
+        for _ in range(steps):
+            candidate = operator.random_move(tour)
+            if candidate is None:
+                continue
+            delta = operator.delta(tour, candidate)
+            if delta < 0 or random.random() < math.exp(-delta / temp):
+                operator.apply(tour, candidate)
+                length += delta
+                accepted += 1
+                if length < best_length:
+                    best_order, best_length = tour.order.copy(), length
+        state[1:] = length, best_order, best_length
+        return length, best_length, accepted
+
+    def best(self, k):
+        return self.states[k][2]
+
+
+class _LocalWorker:
+    """Holds its replicas in this process; used when there is one worker."""
+
+    def __init__(self, problem, move, neighbors, states):
+        self.replicas = _Replicas(problem, move, neighbors, states)
+
+    def send(self, command, *args):
+        self._result = getattr(self.replicas, command)(*args)
+
+    def result(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+class _ProcessWorker:
+    """Holds its replicas in a child process for the whole run; only the
+    commands and their small results cross the pipe."""
+
+    def __init__(self, problem, move, neighbors, states):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve, args=(child, problem, move, neighbors, states),
+                                               daemon=True)
+        self.process.start()
+        child.close()
+
+    def send(self, command, *args):
+        self.conn.send((command, args))
+
+    def result(self):
+        result = self.conn.recv()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def close(self):
+        if self.process.is_alive():
+            self.conn.send(None)
+        self.process.join()
+        self.conn.close()
+
+
+def _serve(conn, problem, move, neighbors, states):
+    replicas = _Replicas(problem, move, neighbors, states)
+    for command, args in iter(conn.recv, None):
+        try:
+            conn.send(getattr(replicas, command)(*args))
+        except Exception as e:
+            conn.send(e)
+
+
+def temperature_ladder(t_min, t_max, n_replicas):
+    """Geometrically spaced temperatures, coldest first."""
+    if n_replicas == 1:
+        return [float(t_min)]
+    return [float(t) for t in np.geomspace(t_min, t_max, n_replicas)]
+
+
+def parallel_tempering(problem, n_replicas=8, t_min=1.0, t_max=100.0, rounds=200, sweep=500,
+                       move="2opt", neighbors=10, workers=None, seed=None, target_gap=None,
+                       start="random"):
+    """Replica-exchange annealing: one chain per temperature, periodically swapped.
+
+    Each round every replica runs `sweep` moves at its own temperature; then
+    neighbouring temperatures exchange states with the usual probability
+    min(1, exp((1/T_k - 1/T_k+1) * (E_k - E_k+1))), even pairs on even
+    rounds and odd pairs on odd rounds. The replicas stay in their worker
+    processes for the whole run and an exchange swaps their temperatures
+    instead of their tours, so a round sends each worker only (replica,
+    temperature, seed) and gets back (length, best length, accepted). The
+    distance matrix is shared with the workers through
+    `multistart.SharedProblem`.
+
+    Every replica starts from its own `start` construction (see
+    `construction.CONSTRUCTIONS`). With `target_gap` (percent) it stops
+    after the first round that brings the best tour within that gap of the
+    best known length or lower bound.
+
+    Returns best_tour, best_length, convergence (best length after every
+    round) and per-temperature statistics.
+    """
+    rng = random.Random(seed)
+    random.seed(rng.randrange(2 ** 63))
+    temps = temperature_ladder(t_min, t_max, n_replicas)
+    dist_matrix = problem.dist_matrix
+
+    states = []
+    for _ in temps:
+        tour = make_tour(start, problem)
+        states.append((tour.order, tour.length(dist_matrix)))
+    lengths = [length for _, length in states]
+    best_replica = min(range(n_replicas), key=lambda k: lengths[k])
+    best_length = lengths[best_replica]
+    convergence = [best_length]
+    target = target_length(problem, target_gap) if target_gap is not None else None
+    stats = [{"temperature": t, "moves": 0, "accepted": 0, "swap_attempts": 0, "swaps": 0} for t in temps]
+    # replica_at[i] is the replica at temperature temps[i]; replica k lives in worker k % workers
+    replica_at = list(range(n_replicas))
+
+    workers = min(workers or os.cpu_count() or 1, n_replicas)
+    shared = None
+    if workers > 1:
+        shared = SharedProblem(problem)
+    pool = []
+    try:
+        for w in range(workers):
+            replicas = {k: states[k] for k in range(w, n_replicas, workers)}
+            if shared is not None:
+                pool.append(_ProcessWorker(shared, move, neighbors, replicas))
+            else:
+                pool.append(_LocalWorker(problem, move, neighbors, replicas))
+
+        for round_id in range(rounds):
+            jobs = [[] for _ in pool]
+            slots = [[] for _ in pool]
+            for i, temp in enumerate(temps):
+                k = replica_at[i]
+                jobs[k % workers].append((k, temp, rng.randrange(2 ** 63)))
+                slots[k % workers].append(i)
+            for worker, worker_jobs in zip(pool, jobs):
+                worker.send("sweep", worker_jobs, sweep)
+            for worker, worker_slots in zip(pool, slots):
+                for i, (length, replica_best_length, accepted) in zip(worker_slots, worker.result()):
+                    k = replica_at[i]
+                    lengths[k] = length
+                    stats[i]["moves"] += sweep
+                    stats[i]["accepted"] += accepted
+                    if replica_best_length < best_length:
+                        best_replica, best_length = k, replica_best_length
+
+            for i in range(round_id % 2, n_replicas - 1, 2):
+                stats[i]["swap_attempts"] += 1
+                cold, hot = replica_at[i], replica_at[i + 1]
+                exponent = (1.0 / temps[i] - 1.0 / temps[i + 1]) * (lengths[cold] - lengths[hot])
+                if exponent >= 0 or rng.random() < math.exp(exponent):
+                    replica_at[i], replica_at[i + 1] = hot, cold
+                    stats[i]["swaps"] += 1
+            convergence.append(best_length)
+            if target is not None and best_length <= target:
+                break
+
+        worker = pool[best_replica % workers]
+        worker.send("best", best_replica)
+        best_order = worker.result()
+    finally:
+        for worker in pool:
+            worker.close()
+        if shared is not None:
+            shared.close()
+
+    for replica in stats:
+        replica["acceptance_rate"] = replica["accepted"] / replica["moves"] if replica["moves"] else 0.0
+        replica["swap_rate"] = replica["swaps"] / replica["swap_attempts"] if replica["swap_attempts"] else 0.0
+    return best_order.tolist(), best_length, convergence, stats
+
+
+if __name__ == '__main__':
+    problem = ProblemInstance("eil76.tsp", cache_dir=DEFAULT_CACHE_DIR)
+
+    start_time = start_timer()
+    best_tour, best_length, convergence, stats = parallel_tempering(problem)
+    elapsed = stop_timer(start_time)
+
+    print(f"Distance: {best_length:.2f} (GAP {problem.GAP(best_length)}%)")
+    print(f"Time: {elapsed:.2f}s")
+    for replica in stats:
+        print(f"T={replica['temperature']:8.2f}  accept={replica['acceptance_rate']:.3f}  "
+              f"swap={replica['swap_rate']:.3f}")
+
+    log_performance(
+        filepath="simanneal_results",
+        algorithm="ParallelTempering",
+        run_id=1,
+        time_taken=elapsed,
+        cost=best_length,
+        convergence_point=convergence[-1],
+        path=",".join(map(str, best_tour)),
+        schedule="ladder",
+        replicas=len(stats)
+    )
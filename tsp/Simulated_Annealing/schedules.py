@@ -0,0 +1,155 @@
+import math
+import sys
+from abc import ABC, abstractmethod
+
+# floor of the cooled temperatures: below the smallest normal float every
+# uphill move is rejected anyway, and subnormal arithmetic is many times slower
+MIN_TEMP = sys.float_info.min
+
+
+class CoolingSchedule(ABC):
+    """Temperature control for `simulated_annealing`.
+
+    `temp` is the current temperature; `step(accepted, improved)` is called
+    once per iteration with whether the move was accepted and whether it
+    improved the best tour, and returns the next temperature.
+    """
+
+    name = None
+
+    def __init__(self, initial_temp, max_iter):
+        self.initial_temp = initial_temp
+        self.max_iter = max_iter
+        self.temp = initial_temp
+
+    @abstractmethod
+    def step(self, accepted, improved):
+        raise NotImplementedError
+
+
+class GeometricSchedule(CoolingSchedule):
+    """T <- alpha * T, the original schedule."""
+
+    name = "geometric"
+
+    def __init__(self, initial_temp, max_iter, cooling_rate=0.995):
+        super().__init__(initial_temp, max_iter)
+        self.cooling_rate = cooling_rate
+
+    def step(self, accepted, improved):
+        self.temp = max(self.temp * self.cooling_rate, MIN_TEMP)
+        return self.temp
+
+
+class LundyMeesSchedule(CoolingSchedule):
+    """T <- T / (1 + beta * T), with beta chosen to reach `final_temp` at max_iter."""
+
+    name = "lundy_mees"
+
+    def __init__(self, initial_temp, max_iter, final_temp=None):
+        super().__init__(initial_temp, max_iter)
+        self.final_temp = final_temp if final_temp is not None else initial_temp * 1e-3
+        self.beta = (initial_temp - self.final_temp) / (max(max_iter, 1) * initial_temp * self.final_temp)
+
+    def step(self, accepted, improved):
+        self.temp /= 1.0 + self.beta * self.temp
+        return self.temp
+
+
+class AdaptiveSchedule(CoolingSchedule):
+    """Steers the acceptance rate along a target that decays over the run.
+
+    Every `window` iterations the observed acceptance rate is compared with
+    the target, which falls geometrically from `target_start` to
+    `target_end`; the temperature is scaled down when too many moves are
+    accepted and up when too few are.
+    """
+
+    name = "adaptive"
+
+    def __init__(self, initial_temp, max_iter, target_start=0.5, target_end=0.005,
+                 window=100, factor=0.9):
+        super().__init__(initial_temp, max_iter)
+        self.target_start = target_start
+        self.target_end = target_end
+        self.window = window
+        self.factor = factor
+        self.iteration = 0
+        self.accepted = 0
+
+    def target(self):
+        progress = min(self.iteration / max(self.max_iter, 1), 1.0)
+        return self.target_start * (self.target_end / self.target_start) ** progress
+
+    def step(self, accepted, improved):
+        self.iteration += 1
+        self.accepted += accepted
+        if self.iteration % self.window == 0:
+            rate = self.accepted / self.window
+            self.temp = max(self.temp * (self.factor if rate > self.target() else 1.0 / self.factor), MIN_TEMP)
+            self.accepted = 0
+        return self.temp
+
+
+class ReheatSchedule(CoolingSchedule):
+    """Geometric cooling that reheats when the best tour stagnates.
+
+    After `patience` iterations without a new best, the temperature jumps
+    back to `reheat_fraction` of the initial temperature.
+    """
+
+    name = "reheat"
+
+    def __init__(self, initial_temp, max_iter, cooling_rate=0.995, patience=None, reheat_fraction=0.3):
+        super().__init__(initial_temp, max_iter)
+        self.cooling_rate = cooling_rate
+        self.patience = patience if patience is not None else max(max_iter // 20, 1)
+        self.reheat_fraction = reheat_fraction
+        self.stagnant = 0
+        self.reheats = 0
+
+    def step(self, accepted, improved):
+        self.stagnant = 0 if improved else self.stagnant + 1
+        if self.stagnant >= self.patience:
+            self.temp = max(self.temp, self.reheat_fraction * self.initial_temp)
+            self.stagnant = 0
+            self.reheats += 1
+        else:
+            self.temp = max(self.temp * self.cooling_rate, MIN_TEMP)
+        return self.temp
+
+
+SCHEDULES = {
+    GeometricSchedule.name: GeometricSchedule,
+    LundyMeesSchedule.name: LundyMeesSchedule,
+    AdaptiveSchedule.name: AdaptiveSchedule,
+    ReheatSchedule.name: ReheatSchedule,
+}
+
+
+def make_schedule(name, initial_temp, max_iter, cooling_rate=0.995):
+    """Builds the registered schedule `name`; cooling_rate applies where it is used."""
+    if name not in SCHEDULES:
+        raise ValueError(f"Unknown schedule '{name}', expected one of {sorted(SCHEDULES)}")
+    if name in (GeometricSchedule.name, ReheatSchedule.name):
+        return SCHEDULES[name](initial_temp, max_iter, cooling_rate=cooling_rate)
+    return SCHEDULES[name](initial_temp, max_iter)
+
+
+def calibrate_initial_temp(operator, tour, samples=500, target_acceptance=0.8):
+    """Temperature at which an average uphill move is accepted with `target_acceptance`.
+
+    Samples random moves of `operator` on `tour` without applying them and
+    solves exp(-mean_uphill_delta / T) = target_acceptance for T.
+    """
+    uphill = []
+    for _ in range(samples):
+        move = operator.random_move(tour)
+        if move is None:
+            continue
+        delta = operator.delta(tour, move)
+        if delta > 0:
+            uphill.append(float(delta))
+    if not uphill:
+        return 1.0
+    return -(sum(uphill) / len(uphill)) / math.log(target_acceptance)
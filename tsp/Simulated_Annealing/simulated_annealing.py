@@ -1,126 +1,206 @@
 import numpy as np
 import random
-import threading
-import time
 import os
-from Problem import ProblemInstance, compute_length
-from utils import start_timer, stop_timer, log_performance, TimeoutException
-
-class Timeout:
-    def __init__(self, seconds):
-        self.seconds = seconds
-        self.timer = None
-
-    def handle_timeout(self):
-        raise TimeoutException()
-
-    def __enter__(self):
-        self.timer = threading.Timer(self.seconds, self.handle_timeout)
-        self.timer.start()
-        return self
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.timer:
-            self.timer.cancel()
-
-def simulated_annealing(problem, max_iter=10000, initial_temp=1000, cooling_rate=0.995):
-    n = problem.nPoints
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from Problem import ProblemInstance
+from moves import make_move
+from cache import DEFAULT_CACHE_DIR
+from multistart import multistart
+from schedules import make_schedule, calibrate_initial_temp
+from bounds import target_length
+from construction import make_tour
+from anytime import Budget, Improvement, run_anytime
+from convergence import ConvergenceRecorder
+from kernels import KERNEL_BLOCK, IMPROVED, TARGET, Annealer, resolve_backend
+from utils import log_performance
+
+def simulated_annealing_anytime(problem, budget=None, initial_temp=1000, cooling_rate=0.995,
+                                move="swap", neighbors=10, schedule="geometric", target_gap=None,
+                                start="random", instrumentation=None, backend="python"):
+    """Anytime annealing: yields an `anytime.Improvement` for the start tour
+    and for every new best tour, until the `budget` or the target gap is
+    reached; returns (iterations, evaluations).
+
+    Random moves come from the `moves.MOVES` operator `move`. `schedule`
+    names a cooling schedule from `schedules.SCHEDULES`; schedules that plan
+    for a horizon use the budget's max_iter (10000 without one).
+    initial_temp="auto" calibrates the starting temperature from sampled
+    move deltas instead of using a fixed value. With `target_gap` (percent)
+    the run stops once the best tour is that close to the best known length,
+    or to the lower bound without one. `start` names the initial tour's
+    construction in `construction.CONSTRUCTIONS`. An
+    `instrumentation.Instrumentation` times the neighbour, delta, move and
+    schedule phases and counts evaluated, accepted, rejected and improving
+    moves. `backend` picks the loop's implementation from `kernels.BACKENDS`:
+    "numba" runs it compiled on the tour's int32 arrays with the same moves,
+    acceptance rule and schedules, drawing from numba's generator (seeded
+    from `random`) instead of `random`.
+    """
+    budget = (budget or Budget(max_iter=10000)).start()
+    timed = instrumentation is not None and instrumentation.timers
     dist_matrix = problem.dist_matrix
+    backend = resolve_backend(backend, dist_matrix)
+    operator = make_move(move, dist_matrix, neighbors, problem.spatial_index)
 
-    def swap_two(tour):
-        a, b = random.sample(range(n), 2)
-        tour[a], tour[b] = tour[b], tour[a]
-        return tour
-
-    current_tour = list(range(n))
-    random.shuffle(current_tour)
-    current_length = compute_length(current_tour, dist_matrix)
-    best_tour = current_tour[:]
+    current_tour = make_tour(start, problem)
+    current_length = current_tour.length(dist_matrix)
     best_length = current_length
-    convergence = [current_length]
-
-    temp = initial_temp
-
-    for _ in range(max_iter):
-        candidate = current_tour[:]
-        candidate = swap_two(candidate)
-        candidate_length = compute_length(candidate, dist_matrix)
-
-        delta = candidate_length - current_length
-        if delta < 0 or random.random() < np.exp(-delta / temp):
-            current_tour = candidate
-            current_length = candidate_length
-
-            if current_length < best_length:
-                best_tour = current_tour[:]
-                best_length = current_length
-
-        convergence.append(best_length)
-        temp *= cooling_rate
-
-    return best_tour, best_length, convergence
+    target = target_length(problem, target_gap) if target_gap is not None else None
+    evaluations = 0
+    yield Improvement(current_tour.tolist(), best_length, 0, evaluations, budget.elapsed())
+
+    if initial_temp == "auto":
+        initial_temp = calibrate_initial_temp(operator, current_tour)
+    horizon = budget.max_iter if budget.max_iter is not None else 10000
+    schedule = make_schedule(schedule, initial_temp, horizon, cooling_rate)
+    temp = schedule.temp
+    if backend == "numba":
+        annealer = Annealer(move, current_tour, dist_matrix, operator.neighbors, schedule, current_length,
+                            random.getrandbits(32))
+        return (yield from _anneal_compiled(annealer, budget, target, instrumentation))
+
+    iteration = 0
+    while not budget.exhausted(iteration, evaluations):
+        iteration += 1
+        accepted = improved = False
+        if timed:
+            instrumentation.mark()
+        candidate = operator.random_move(current_tour)
+        if timed:
+            instrumentation.lap("neighbour")
+        if candidate is not None:
+            delta = operator.delta(current_tour, candidate)
+            evaluations += 1
+            if delta < 0 or random.random() < np.exp(-delta / temp):
+                if timed:
+                    instrumentation.lap("delta")
+                operator.apply(current_tour, candidate)
+                current_length += delta
+                accepted = True
+                if timed:
+                    instrumentation.lap("move")
+
+                if current_length < best_length:
+                    best_length = current_length
+                    improved = True
+                    if instrumentation is not None:
+                        instrumentation.count("improved")
+                    yield Improvement(current_tour.tolist(), best_length, iteration,
+                                      evaluations, budget.elapsed())
+                    if timed:
+                        instrumentation.mark()
+            elif timed:
+                instrumentation.lap("delta")
+            if instrumentation is not None:
+                instrumentation.moves(1, accepted)
+
+        if target is not None and best_length <= target:
+            break
+        temp = schedule.step(accepted, improved)
+        if timed:
+            instrumentation.lap("schedule")
+    return iteration, evaluations
+
+
+def _anneal_compiled(annealer, budget, target, instrumentation):
+    """The annealing loop above run by `kernels.anneal`, which returns to
+    yield each new best tour and otherwise every KERNEL_BLOCK iterations
+    (rounded to the budget's check_every) for the budget check."""
+    block = -(-KERNEL_BLOCK // budget.check_every) * budget.check_every
+    if instrumentation is not None and instrumentation.timers:
+        instrumentation.mark()
+    while not budget.exhausted(annealer.iteration, annealer.evaluations):
+        stop = (annealer.iteration // block + 1) * block
+        if budget.max_iter is not None:
+            stop = min(stop, budget.max_iter)
+        before = annealer.counters.copy()
+        status = annealer.run(stop, budget.max_evals, target)
+        if instrumentation is not None:
+            evaluated, accepted, improved = (annealer.counters - before)[1:].tolist()
+            instrumentation.moves(evaluated, accepted)
+            instrumentation.count("improved", improved)
+            if instrumentation.timers:
+                instrumentation.lap("kernel")
+        if status & IMPROVED:
+            yield Improvement(annealer.tour.tolist(), annealer.best_length, annealer.iteration,
+                              annealer.evaluations, budget.elapsed())
+            if instrumentation is not None and instrumentation.timers:
+                instrumentation.mark()
+        if status & TARGET:
+            break
+    return annealer.iteration, annealer.evaluations
+
+
+def simulated_annealing(problem, max_iter=10000, initial_temp=1000, cooling_rate=0.995,
+                        move="swap", neighbors=10, schedule="geometric", target_gap=None,
+                        start="random", time_limit=None, max_evals=None, callback=None, recorder=None,
+                        instrumentation=None, backend="python"):
+    """Runs `simulated_annealing_anytime` to the end: (tour, length, convergence).
+
+    `time_limit` (seconds), `max_iter` and `max_evals` bound the run, which
+    then returns its best tour so far; `callback(improvement)` sees every new
+    best and stops the run by returning True. The convergence is an array of
+    best lengths sampled about 20 times per decade of iterations, or the
+    given `convergence.ConvergenceRecorder`. `instrumentation` and
+    `backend` are passed on to `simulated_annealing_anytime`.
+    """
+    budget = Budget(time_limit, max_iter, max_evals)
+    trace = recorder if recorder is not None else ConvergenceRecorder("log")
+    best, _, _ = run_anytime(
+        simulated_annealing_anytime(problem, budget, initial_temp, cooling_rate, move, neighbors,
+                                    schedule, target_gap, start, instrumentation, backend),
+        callback, trace)
+    return best.tour, best.length, trace if recorder is not None else trace.lengths()
 
 if __name__ == '__main__':
-    problem = ProblemInstance("eil76.tsp")
+    problem = ProblemInstance("eil76.tsp", cache_dir=DEFAULT_CACHE_DIR)
     runs = 5
-    timeout_seconds = 600  # 10 minutes
+    schedule = "geometric"
+    time_limit = 600  # 10 minutes per run, then the best tour so far is kept
+    workers = min(runs, os.cpu_count() or 1)
 
     if not os.path.exists("frames"):
         os.makedirs("frames")
 
-    best_overall_tour = None
-    best_overall_dist = float('inf')
+    best_overall = None
     all_times = []
 
-    for run in range(1, runs + 1):
+    print(f"\n--- Starting {runs} runs on {workers} worker(s) ---")
+    for result in multistart(simulated_annealing, problem, runs, workers=workers,
+                             time_limit=time_limit, schedule=schedule):
+        run = result["run"]
         try:
-            with Timeout(timeout_seconds):
-                print(f"\n--- Starting Run {run} ---")
-                start_time = start_timer()
-
-                current_tour, current_dist, convergence = simulated_annealing(problem)
-
-                elapsed = stop_timer(start_time)
-                all_times.append(elapsed)
-
-                if current_dist < best_overall_dist:
-                    best_overall_dist = current_dist
-                    best_overall_tour = current_tour
-                    np.savetxt("best_sa_tour.txt", best_overall_tour, fmt='%d')
-
-                print(f"Run {run} completed:")
-                print(f"Distance: {current_dist:.2f}")
-                print(f"Time: {elapsed:.2f}s")
-                print(f"Convergence: {convergence[-1]:.2f}")
-
-                log_performance(
-                    filepath="simanneal_results.csv",
-                    algorithm="SimulatedAnnealing",
-                    run_id=run,
-                    time_taken=elapsed,
-                    cost=current_dist,
-                    reward=1,
-                    convergence_point=convergence[-1],
-                    path=",".join(map(str, current_tour))
-                )
-        except TimeoutException:
-            print(f"Run {run} timed out after {timeout_seconds//60} minutes")
+            all_times.append(result["time"])
+
+            if best_overall is None or result["length"] < best_overall["length"]:
+                best_overall = result
+                np.savetxt("best_sa_tour.txt", best_overall["tour"], fmt='%d')
+
+            stopped = result["time"] >= time_limit
+            print(f"Run {run} {'stopped at the time limit' if stopped else 'completed'} (seed {result['seed']}):")
+            print(f"Distance: {result['length']:.2f}")
+            print(f"Time: {result['time']:.2f}s")
+            print(f"Convergence: {result['convergence_point']:.2f}")
+
             log_performance(
-                filepath="simanneal_results.csv",
+                filepath="simanneal_results",
                 algorithm="SimulatedAnnealing",
                 run_id=run,
-                time_taken=timeout_seconds,
-                cost=-1,
-                reward=0,
-                convergence_point=-1,
-                path="None"
+                time_taken=result["time"],
+                cost=result["length"],
+                convergence_point=result["convergence_point"],
+                path=",".join(map(str, result["tour"])),
+                status="time_limit" if stopped else "ok",
+                schedule=schedule,
+                seed=result["seed"]
             )
         except Exception as e:
             print(f"An error occurred during Run {run}: {e}")
 
-    if best_overall_tour is not None:
+    if best_overall is not None:
         print("\n=== Best Solution ===")
-        print(f"Distance: {best_overall_dist:.2f}")
+        print(f"Distance: {best_overall['length']:.2f}")
         print(f"Average Time: {np.mean(all_times):.2f}s")
     else:
         print("\nNo valid solution found in any run!")
@@ -1,8 +1,10 @@
 # utils.py
 import time
-import csv
-import os
 import signal
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from results import log_performance
 
 class TimeoutException(Exception):
     pass
@@ -15,13 +17,3 @@ def start_timer():
 
 def stop_timer(start_time):
     return time.time() - start_time
-
-def log_performance(filepath, algorithm, run_id, time_taken, distance, convergence_point):
-    cost = distance  # define it clearly if needed
-    file_exists = os.path.isfile(filepath)
-    with open(filepath, mode='a', newline='') as file:
-        writer = csv.writer(file)
-        if not file_exists:
-            writer.writerow(['Algorithm', 'Run', 'TimeTaken', 'Distance', 'ConvergencePoint', 'Cost'])
-        writer.writerow([algorithm, run_id, time_taken, distance, convergence_point, cost])
-
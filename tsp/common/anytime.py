@@ -0,0 +1,70 @@
+import time
+from collections import namedtuple
+
+# one improving solution reported by an anytime solver; `tour` is a list
+Improvement = namedtuple("Improvement", "tour length iteration evaluations elapsed")
+
+
+class Budget:
+    """Wall-clock, iteration and evaluation limits for one solver run.
+
+    Any limit left as None is unbounded. The clock is only read every
+    `check_every` iterations, so checking the budget costs a couple of
+    integer comparisons per iteration; expensive iterations (a full
+    neighbourhood scan) should use check_every=1.
+    """
+
+    def __init__(self, time_limit=None, max_iter=None, max_evals=None, check_every=64):
+        self.time_limit = time_limit
+        self.max_iter = max_iter
+        self.max_evals = max_evals
+        self.check_every = max(1, check_every)
+        self.started = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        return self
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def exhausted(self, iteration, evaluations=0):
+        """True once `iteration` iterations or `evaluations` move evaluations
+        reach their limits, or (checked every `check_every` iterations) the
+        time limit has passed."""
+        if self.max_iter is not None and iteration >= self.max_iter:
+            return True
+        if self.max_evals is not None and evaluations >= self.max_evals:
+            return True
+        return self.time_limit is not None and iteration % self.check_every == 0 \
+            and time.perf_counter() - self.started >= self.time_limit
+
+
+def run_anytime(steps, callback=None, recorder=None):
+    """Drives an anytime solver generator to the end: (best, iterations, evaluations).
+
+    `best` is the last Improvement, the best tour found. Every improvement
+    is passed to `recorder.record(iteration, length)` (see
+    `convergence.ConvergenceRecorder`), which is finished afterwards, and to
+    `callback(improvement)`, which may return True to stop the run there.
+    `iterations` and `evaluations` are how many iterations ran and how many
+    moves they evaluated, which the generator returns.
+    """
+    best = None
+    iterations = evaluations = None
+    while True:
+        try:
+            best = next(steps)
+        except StopIteration as stop:
+            iterations, evaluations = stop.value
+            break
+        if recorder is not None:
+            recorder.record(best.iteration, best.length)
+        if callback is not None and callback(best):
+            steps.close()
+            break
+    if iterations is None:
+        iterations, evaluations = best.iteration, best.evaluations
+    if recorder is not None:
+        recorder.finish(iterations)
+    return best, iterations, evaluations
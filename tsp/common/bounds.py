@@ -0,0 +1,132 @@
+import numpy as np
+
+
+def _row(dist_matrix, i):
+    return np.array(dist_matrix[i], dtype=float)
+
+
+def minimum_spanning_tree(dist_matrix, pi=None, skip=None):
+    """Prim's algorithm on a dense (or lazy) matrix: (cost, parent).
+
+    Works on one matrix row per step, so it needs O(n) extra memory. Edge
+    costs are d[i, j] + pi[i] + pi[j]; node `skip` is left out of the tree.
+    The root and `skip` get parent -1.
+    """
+    n = len(dist_matrix)
+    pi = np.zeros(n) if pi is None else pi
+    in_tree = np.zeros(n, dtype=bool)
+    if skip is not None:
+        in_tree[skip] = True
+    root = 1 if skip == 0 else 0
+    in_tree[root] = True
+
+    key = _row(dist_matrix, root) + pi[root] + pi
+    key[in_tree] = np.inf
+    parent = np.full(n, root)
+    cost = 0.0
+    for _ in range(n - int(in_tree.sum())):
+        v = int(np.argmin(key))
+        cost += key[v]
+        in_tree[v] = True
+        key[v] = np.inf
+        row = _row(dist_matrix, v) + pi[v] + pi
+        better = (row < key) & ~in_tree
+        key[better] = row[better]
+        parent[better] = v
+
+    parent[root] = -1
+    if skip is not None:
+        parent[skip] = -1
+    return cost, parent
+
+
+def one_tree(dist_matrix, pi, special=0):
+    """Minimum 1-tree under node penalties `pi`: (cost, degrees).
+
+    A spanning tree on every node but `special` plus the two cheapest edges
+    from `special`, with edge costs d[i, j] + pi[i] + pi[j].
+    """
+    n = len(pi)
+    cost, parent = minimum_spanning_tree(dist_matrix, pi, skip=special)
+    children = np.flatnonzero(parent >= 0)
+    degrees = np.bincount(children, minlength=n) + np.bincount(parent[children], minlength=n)
+
+    row = _row(dist_matrix, special) + pi[special] + pi
+    row[special] = np.inf
+    closest = np.argpartition(row, 1)[:2]
+    cost += row[closest].sum()
+    degrees[closest] += 1
+    degrees[special] += 2
+    return cost, degrees
+
+
+def nearest_neighbor_length(dist_matrix, start=0):
+    """Length of the greedy nearest-neighbour tour from `start`, an upper bound."""
+    n = len(dist_matrix)
+    visited = np.zeros(n, dtype=bool)
+    visited[start] = True
+    current, length = start, 0.0
+    for _ in range(n - 1):
+        row = _row(dist_matrix, current)
+        row[visited] = np.inf
+        nxt = int(np.argmin(row))
+        length += row[nxt]
+        visited[nxt] = True
+        current = nxt
+    return length + float(dist_matrix[current, start])
+
+
+def held_karp_bound(dist_matrix, upper_bound=None, max_iter=1000, period=10, tol=1e-6):
+    """Held-Karp lower bound on the optimal tour length by subgradient ascent.
+
+    Each iteration solves a 1-tree with penalties pi, whose cost minus
+    2 * sum(pi) is a valid lower bound, and moves pi along the degree
+    violations with the Held-Wolfe-Crowder step
+    lam * (upper_bound - bound) / ||deg - 2||^2; lam halves after `period`
+    iterations without progress. Stops early when the 1-tree is a tour
+    (the bound is then optimal). Integer distances get the bound rounded up.
+
+    Every iteration costs O(n^2), so this is meant for instances of up to a
+    few thousand cities.
+    """
+    n = len(dist_matrix)
+    if n < 3:
+        return 2.0 * float(dist_matrix[0, n - 1]) if n == 2 else 0.0
+    if upper_bound is None:
+        upper_bound = nearest_neighbor_length(dist_matrix)
+
+    pi = np.zeros(n)
+    best = -np.inf
+    lam = 2.0
+    stalled = 0
+    for _ in range(max_iter):
+        cost, degrees = one_tree(dist_matrix, pi)
+        bound = cost - 2.0 * pi.sum()
+        if bound > best + tol:
+            best, stalled = bound, 0
+        else:
+            stalled += 1
+            if stalled >= period:
+                lam, stalled = lam / 2.0, 0
+        subgradient = degrees - 2
+        norm = float(subgradient @ subgradient)
+        if norm == 0 or lam < 1e-6 or best >= upper_bound - tol:
+            break
+        pi += lam * (upper_bound - bound) / norm * subgradient
+
+    if _integral(dist_matrix):
+        best = np.ceil(best - tol)
+    return float(best)
+
+
+def _integral(dist_matrix):
+    # judged from the first row; every supported metric rounds all or none
+    sample = np.asarray(dist_matrix[0], dtype=float)
+    return bool(np.all(sample == np.round(sample)))
+
+
+def target_length(problem, gap):
+    """Tour length within `gap` percent of the best known value or, without
+    one, of the problem's lower bound."""
+    reference = problem.best_sol if problem.best_sol is not None else problem.lower_bound()
+    return reference * (1.0 + gap / 100.0)
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+from tsplib import TSPLibInstance, read_tsplib
+
+# bump when the parser or the cached layout changes, so stale entries are ignored
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tsp_cache")
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Content hash of a file (plus CACHE_VERSION), used as its cache key."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"v{CACHE_VERSION}".encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class InstanceCache:
+    """On-disk cache of parsed TSPLIB instances and their distance matrices.
+
+    Entries live in <cache_dir>/<content hash>/ as raw .npy files, so any
+    number of processes can np.load(..., mmap_mode='r') them and share the
+    pages without copying. Files are written under a temporary name and
+    renamed into place, which keeps concurrent writers from exposing half
+    written entries.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def entry_dir(self, digest):
+        path = os.path.join(self.cache_dir, digest)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def load_instance(self, path):
+        """(digest, TSPLibInstance) for `path`, parsing it only on a cache miss."""
+        digest = file_digest(path)
+        entry = self.entry_dir(digest)
+        header_path = os.path.join(entry, "header.json")
+        if not os.path.exists(header_path):
+            instance = read_tsplib(path)
+            for name in ("coords", "node_ids", "weights"):
+                array = getattr(instance, name)
+                if array is not None:
+                    self._save(os.path.join(entry, f"{name}.npy"), array)
+            self._write_atomic(header_path, json.dumps(instance.header).encode())
+
+        with open(header_path) as f:
+            header = json.load(f)
+        arrays = [self._load(os.path.join(entry, f"{name}.npy"))
+                  for name in ("coords", "node_ids", "weights")]
+        return digest, TSPLibInstance(header, *arrays)
+
+    def dist_matrix(self, digest, dtype, shape, fill):
+        """Read-only memory map of a cached distance matrix.
+
+        On a miss, `fill(out)` writes the matrix into a fresh memory-mapped
+        file, so even matrices larger than RAM are built block by block.
+        """
+        path = os.path.join(self.entry_dir(digest), f"dist_{np.dtype(dtype).name}.npy")
+        if not os.path.exists(path):
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            os.close(fd)
+            out = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=shape)
+            fill(out)
+            out.flush()
+            del out
+            os.replace(tmp, path)
+        return np.load(path, mmap_mode="r")
+
+    @staticmethod
+    def _load(path):
+        return np.load(path, mmap_mode="r") if os.path.exists(path) else None
+
+    @staticmethod
+    def _save(path, array):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.asarray(array))
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _write_atomic(path, data):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
@@ -0,0 +1,260 @@
+import random
+import numpy as np
+from bounds import minimum_spanning_tree
+from moves import nearest_neighbors
+from spatial import PLANAR_TYPES, UniformGrid, make_spatial_index
+from tour import Tour
+
+
+def _coords(problem):
+    """The problem's (n, 2) coordinates, or None if it only has a matrix."""
+    coords = np.asarray(problem.points[:, 1:3], dtype=float)
+    if np.ptp(coords, axis=0).max() == 0 and problem.nPoints > 1:
+        return None
+    return coords
+
+
+def random_tour(problem):
+    return Tour.random(problem.nPoints)
+
+
+def nearest_neighbor_tour(problem, start=None):
+    """Greedy nearest-neighbour tour from `start` (a random city by default).
+
+    Planar instances query a bucket grid, so each step only looks at nearby
+    cities; other metrics fall back to scanning a matrix row per step.
+    """
+    n = problem.nPoints
+    start = random.randrange(n) if start is None else start
+    coords = _coords(problem) if problem.edge_weight_type in PLANAR_TYPES else None
+    order = [start]
+    if coords is not None:
+        grid = UniformGrid(coords)
+        grid.remove(start)
+        for _ in range(n - 1):
+            city = int(grid.query(coords[order[-1]])[1][0])
+            grid.remove(city)
+            order.append(city)
+        return Tour(order)
+
+    visited = np.zeros(n, dtype=bool)
+    visited[start] = True
+    for _ in range(n - 1):
+        row = np.array(problem.dist_matrix[order[-1]], dtype=float)
+        row[visited] = np.inf
+        city = int(np.argmin(row))
+        visited[city] = True
+        order.append(city)
+    return Tour(order)
+
+
+def greedy_edge_tour(problem, neighbors=10):
+    """Greedy matching tour: shortest candidate edges first, no city of degree 3
+    and no early cycle; the resulting paths are chained nearest end first."""
+    dist_matrix = problem.dist_matrix
+    n = problem.nPoints
+    if n < 3:
+        return Tour(range(n))
+    candidates = nearest_neighbors(dist_matrix, neighbors, problem.spatial_index)
+    i = np.repeat(np.arange(n), candidates.shape[1])
+    j = candidates.ravel().astype(np.int64)
+    pairs = np.unique(np.stack([np.minimum(i, j), np.maximum(i, j)], axis=1), axis=0)
+    weights = np.asarray(dist_matrix[pairs[:, 0], pairs[:, 1]], dtype=float)
+
+    degree = np.zeros(n, dtype=np.int64)
+    root = list(range(n))
+    adjacent = [[] for _ in range(n)]
+
+    def find(x):
+        while root[x] != x:
+            root[x] = root[root[x]]
+            x = root[x]
+        return x
+
+    for a, b in pairs[np.argsort(weights, kind="stable")].tolist():
+        if degree[a] < 2 and degree[b] < 2:
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                root[ra] = rb
+                degree[a] += 1
+                degree[b] += 1
+                adjacent[a].append(b)
+                adjacent[b].append(a)
+
+    paths = []
+    seen = np.zeros(n, dtype=bool)
+    for city in np.flatnonzero(degree < 2).tolist():
+        if seen[city]:
+            continue
+        path, prev = [city], -1
+        seen[city] = True
+        while True:
+            nxt = [c for c in adjacent[path[-1]] if c != prev]
+            if not nxt:
+                break
+            prev = path[-1]
+            path.append(nxt[0])
+            seen[nxt[0]] = True
+        paths.append(path)
+    return Tour(_chain_paths(dist_matrix, paths))
+
+
+def _chain_paths(dist_matrix, paths):
+    """Concatenates paths, each time attaching the one with the closest end."""
+    heads = np.array([p[0] for p in paths])
+    tails = np.array([p[-1] for p in paths])
+    used = np.zeros(len(paths), dtype=bool)
+    used[0] = True
+    order = list(paths[0])
+    for _ in range(len(paths) - 1):
+        last = order[-1]
+        to_head = np.where(used, np.inf, np.asarray(dist_matrix[last, heads], dtype=float))
+        to_tail = np.where(used, np.inf, np.asarray(dist_matrix[last, tails], dtype=float))
+        h, t = int(np.argmin(to_head)), int(np.argmin(to_tail))
+        if to_head[h] <= to_tail[t]:
+            order.extend(paths[h])
+            used[h] = True
+        else:
+            order.extend(reversed(paths[t]))
+            used[t] = True
+    return order
+
+
+def hilbert_index(coords, bits=16):
+    """Position of each point along a Hilbert curve over the bounding box."""
+    coords = np.asarray(coords, dtype=float)
+    side = 1 << bits
+    low = coords.min(axis=0)
+    span = max(np.ptp(coords, axis=0).max(), 1e-12)
+    scaled = np.minimum(((coords - low) / span * side).astype(np.int64), side - 1)
+    x, y = scaled[:, 0].copy(), scaled[:, 1].copy()
+    index = np.zeros(len(coords), dtype=np.int64)
+    s = side >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        index += s * s * ((3 * rx) ^ ry)
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s >>= 1
+    return index
+
+
+def space_filling_curve_tour(problem):
+    """Cities in Hilbert curve order: O(n log n), typically about 25% above optimal."""
+    coords = _coords(problem)
+    if coords is None:
+        raise ValueError("space_filling_curve start needs node coordinates")
+    return Tour(np.argsort(hilbert_index(coords), kind="stable"))
+
+
+def christofides_tour(problem, neighbors=10):
+    """Christofides-style tour: MST, greedy matching of its odd-degree
+    cities, Euler circuit of the union, then shortcuts.
+
+    The matching is greedy over nearest-neighbour candidates rather than a
+    minimum perfect matching, so the 1.5 guarantee does not hold, but the
+    tours are usually close to those of the exact construction.
+    """
+    dist_matrix = problem.dist_matrix
+    n = problem.nPoints
+    if n < 3:
+        return Tour(range(n))
+    _, parent = minimum_spanning_tree(dist_matrix)
+    children = np.flatnonzero(parent >= 0)
+    adjacent = [[] for _ in range(n)]
+    for child, par in zip(children.tolist(), parent[children].tolist()):
+        adjacent[child].append(par)
+        adjacent[par].append(child)
+
+    odd = np.flatnonzero(np.array([len(a) for a in adjacent]) % 2)
+    coords = _coords(problem) if problem.edge_weight_type in PLANAR_TYPES else None
+    for a, b in _greedy_matching(dist_matrix, odd, neighbors, coords):
+        adjacent[a].append(b)
+        adjacent[b].append(a)
+
+    # Hierholzer's algorithm, skipping cities already visited
+    stack, circuit = [0], []
+    while stack:
+        city = stack[-1]
+        if adjacent[city]:
+            nxt = adjacent[city].pop()
+            adjacent[nxt].remove(city)
+            stack.append(nxt)
+        else:
+            circuit.append(stack.pop())
+    visited = np.zeros(n, dtype=bool)
+    order = []
+    for city in circuit:
+        if not visited[city]:
+            visited[city] = True
+            order.append(city)
+    return Tour(order)
+
+
+def _greedy_matching(dist_matrix, cities, neighbors, coords=None):
+    """Pairs up `cities` shortest candidate edge first; leftovers are paired
+    with their nearest unmatched city."""
+    m = len(cities)
+    if m == 0:
+        return []
+    sub = np.asarray(dist_matrix[cities[:, None], cities[None, :]], dtype=float) \
+        if m <= 2000 else None
+    if coords is not None and m > 2000:
+        candidates = make_spatial_index(coords[cities]).knn_all(neighbors)
+    elif sub is not None:
+        k = min(neighbors, m - 1)
+        masked = sub.copy()
+        np.fill_diagonal(masked, np.inf)
+        candidates = np.argpartition(masked, k - 1, axis=1)[:, :k]
+    else:
+        candidates = _subset_neighbors(dist_matrix, cities, neighbors)
+    i = np.repeat(np.arange(m), candidates.shape[1])
+    j = candidates.ravel()
+    weights = sub[i, j] if sub is not None else np.asarray(dist_matrix[cities[i], cities[j]], dtype=float)
+
+    matched = np.zeros(m, dtype=bool)
+    pairs = []
+    shortest = np.argsort(weights, kind="stable")
+    for a, b in zip(i[shortest].tolist(), j[shortest].tolist()):
+        if a != b and not matched[a] and not matched[b]:
+            matched[a] = matched[b] = True
+            pairs.append((a, b))
+    for a in range(m):
+        if matched[a]:
+            continue
+        matched[a] = True
+        rest = np.flatnonzero(~matched)
+        b = int(rest[np.argmin(np.asarray(dist_matrix[cities[a], cities[rest]], dtype=float))])
+        matched[b] = True
+        pairs.append((a, b))
+    return [(int(cities[a]), int(cities[b])) for a, b in pairs]
+
+
+def _subset_neighbors(dist_matrix, cities, k):
+    """k nearest members of `cities` for each of them, one row at a time."""
+    k = min(k, len(cities) - 1)
+    result = np.empty((len(cities), k), dtype=np.int64)
+    for a, city in enumerate(cities.tolist()):
+        row = np.array(dist_matrix[city], dtype=float)[cities]
+        row[a] = np.inf
+        result[a] = np.argpartition(row, k - 1)[:k]
+    return result
+
+
+CONSTRUCTIONS = {
+    "random": random_tour,
+    "nearest_neighbor": nearest_neighbor_tour,
+    "greedy": greedy_edge_tour,
+    "space_filling_curve": space_filling_curve_tour,
+    "christofides": christofides_tour,
+}
+
+
+def make_tour(name, problem):
+    """Initial Tour for `problem` built by the registered construction `name`."""
+    if name not in CONSTRUCTIONS:
+        raise ValueError(f"Unknown start '{name}', expected one of {sorted(CONSTRUCTIONS)}")
+    return CONSTRUCTIONS[name](problem)
@@ -0,0 +1,165 @@
+import math
+import numpy as np
+
+# one record per sample: iteration and best length from that iteration on
+RECORD = np.dtype([("iteration", "<i8"), ("length", "<f8")])
+
+MODES = ("every", "improvement", "log")
+
+
+class ConvergenceRecorder:
+    """Constant-memory convergence trace.
+
+    Solvers report change points with `record(iteration, length)`, meaning
+    the best length is `length` from that iteration until the next call,
+    and `finish(iterations)` at the end. The recorder keeps samples of that
+    step function according to `mode`:
+
+    - "every": the best length at every `every`-th iteration,
+    - "improvement": only the change points themselves,
+    - "log": about `per_decade` samples per decade of iterations.
+
+    Samples go to a fixed-size structured array. With `path`, full buffers
+    are appended to that file (raw RECORD rows, see `load_convergence`).
+    Without one the buffer is the whole trace: when it fills, every other
+    sample is dropped and the sampling interval doubles, so the trace is
+    decimated rather than grown. Either way memory stays bounded however
+    long the run is. Supports len() and indexing like the lists it
+    replaces.
+    """
+
+    def __init__(self, mode="log", every=1, per_decade=20, path=None, buffer_size=1 << 16):
+        if mode not in MODES:
+            raise ValueError(f"Unknown sampling mode '{mode}', expected one of {MODES}")
+        self.mode = mode
+        self.every = max(1, every)
+        self.factor = 10 ** (1.0 / per_decade)
+        self.path = path
+        self.buffer = np.empty(buffer_size, dtype=RECORD)
+        self.used = 0
+        self.flushed = 0
+        # change points kept in "improvement" mode: one in `stride`
+        self.stride = 1
+        self.changes = 0
+        self.last = None
+        self.last_iteration = -1
+        self.last_sampled = -1
+        self.tail = None
+        self.next_mark = 0
+        if path is not None:
+            open(path, "wb").close()
+
+    def __len__(self):
+        return self.flushed + self.used
+
+    def __getitem__(self, key):
+        if key == -1 and len(self):
+            return self.tail
+        return self.array()["length"][key]
+
+    def __iter__(self):
+        return iter(self.array()["length"].tolist())
+
+    def tolist(self):
+        return self.array()["length"].tolist()
+
+    def lengths(self):
+        """The sampled lengths as a float array."""
+        return self.array()["length"]
+
+    def array(self):
+        """All samples so far as a RECORD array (read back from disk if flushed)."""
+        if self.path is None:
+            return self.buffer[:self.used].copy()
+        return np.concatenate([load_convergence(self.path), self.buffer[:self.used]])
+
+    def _append(self, iterations, length):
+        iterations = np.asarray(iterations, dtype=np.int64).ravel()
+        start = 0
+        while start < len(iterations):
+            take = min(len(iterations) - start, len(self.buffer) - self.used)
+            block = self.buffer[self.used:self.used + take]
+            block["iteration"] = iterations[start:start + take]
+            block["length"] = length
+            self.used += take
+            start += take
+            self.tail = length
+            self.last_sampled = block["iteration"][-1]
+            if self.used == len(self.buffer):
+                self.flush()
+
+    def _samples(self, first, last):
+        """Sample iterations in [first, last] under the current mode."""
+        if self.mode == "every":
+            begin = -(-first // self.every) * self.every
+            return np.arange(begin, last + 1, self.every)
+        marks = []
+        while self.next_mark <= last:
+            if self.next_mark >= first:
+                marks.append(self.next_mark)
+            self.next_mark = max(self.next_mark + 1, math.ceil(self.next_mark * self.factor))
+        return marks
+
+    def _fill(self, first, last, length):
+        """Samples the constant `length` over iterations first..last, at
+        most a buffer's worth at a time."""
+        while first <= last:
+            end = last
+            if self.mode == "every":
+                end = min(first + len(self.buffer) * self.every - 1, last)
+            self._append(self._samples(first, end), length)
+            first = end + 1
+
+    def record(self, iteration, length):
+        """The best length is `length` from `iteration` on."""
+        if self.mode == "improvement":
+            if self.changes % self.stride == 0:
+                self._append([iteration], length)
+            self.changes += 1
+            self.tail = length
+        else:
+            if self.last is not None:
+                self._fill(self.last_iteration + 1, iteration - 1, self.last)
+            self._fill(iteration, iteration, length)
+        self.last, self.last_iteration = length, iteration
+
+    def finish(self, iterations):
+        """Closes the trace after `iterations` iterations and flushes it;
+        the final iteration is always sampled."""
+        if self.last is not None and self.mode != "improvement" and iterations > self.last_iteration:
+            self._fill(self.last_iteration + 1, iterations - 1, self.last)
+            self._append([iterations], self.last)
+            self.last_iteration = iterations
+        elif self.last is not None and self.last_sampled != self.last_iteration:
+            # "improvement" mode skipped the last change point; keep it anyway
+            self._append([self.last_iteration], self.last)
+        self.flush()
+        return self
+
+    def flush(self):
+        if not self.used:
+            return
+        if self.path is None:
+            self._decimate()
+            return
+        with open(self.path, "ab") as f:
+            self.buffer[:self.used].tofile(f)
+        self.flushed += self.used
+        self.used = 0
+
+    def _decimate(self):
+        """Halves a full in-memory trace: keeps every other sample, and the
+        latest one, and samples half as often from here on."""
+        if self.used < len(self.buffer):
+            return
+        kept = np.concatenate([self.buffer[0:self.used - 1:2], self.buffer[self.used - 1:self.used]])
+        self.buffer[:len(kept)] = kept
+        self.used = len(kept)
+        self.every *= 2
+        self.factor *= self.factor
+        self.stride *= 2
+
+
+def load_convergence(path):
+    """Reads a trace written by a ConvergenceRecorder with a `path`."""
+    return np.fromfile(path, dtype=RECORD)
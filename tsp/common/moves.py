@@ -0,0 +1,260 @@
+import random
+from abc import ABC, abstractmethod
+import numpy as np
+from neighborhood import swap_delta, row_blocks
+
+# moves act on tour.Tour; tour.order maps position -> city, tour.pos city -> position
+IMPROVEMENT_TOL = 1e-9
+
+
+def nearest_neighbors(dist_matrix, k=10, index=None):
+    """(n, k) array of each city's k nearest other cities, closest first.
+
+    With a `spatial` index the lists come from it instead of from scanning
+    every matrix row, which avoids touching all n^2 distances.
+    """
+    n = dist_matrix.shape[0]
+    k = max(0, min(k, n - 1))
+    if index is not None:
+        return index.knn_all(k).astype(np.int32)
+    neighbors = np.empty((n, k), dtype=np.int32)
+    for rows in row_blocks(n):
+        block = np.array(dist_matrix[rows], dtype=float)
+        block[np.arange(block.shape[0]), np.arange(n)[rows]] = np.inf
+        nearest = np.argpartition(block, k - 1, axis=1)[:, :k] if k else block[:, :0].astype(int)
+        order = np.argsort(np.take_along_axis(block, nearest, axis=1), axis=1, kind="stable")
+        neighbors[rows] = np.take_along_axis(nearest, order, axis=1)
+    return neighbors
+
+
+class MoveOperator(ABC):
+    """A neighbourhood: random moves for annealing, candidate scans for descent.
+
+    Candidate moves always create an edge between a city and one of its
+    `neighbors`, so a full scan costs O(n * k) rather than O(n^2).
+    """
+
+    name = None
+
+    def __init__(self, dist_matrix, neighbors):
+        self.dist = dist_matrix
+        self.neighbors = neighbors.tolist()
+        # candidate deltas computed by best_move, for evaluation budgets
+        self.evaluations = 0
+
+    @abstractmethod
+    def random_move(self, tour):
+        """A random candidate move, or None if the draw was degenerate."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def candidates(self, tour):
+        raise NotImplementedError
+
+    @abstractmethod
+    def delta(self, tour, move):
+        raise NotImplementedError
+
+    @abstractmethod
+    def apply(self, tour, move):
+        raise NotImplementedError
+
+    def best_move(self, tour):
+        """(move, delta) of the best candidate, or None if nothing improves."""
+        best, best_delta = None, -IMPROVEMENT_TOL
+        for move in self.candidates(tour):
+            delta = self.delta(tour, move)
+            self.evaluations += 1
+            if delta < best_delta:
+                best, best_delta = move, delta
+        return None if best is None else (best, best_delta)
+
+
+class SwapMove(MoveOperator):
+    """Exchanges two cities. Random draws are unrestricted, as in `swap_two`."""
+
+    name = "swap"
+
+    def random_move(self, tour):
+        return tuple(random.sample(range(len(tour)), 2))
+
+    def candidates(self, tour):
+        order, pos = tour.order.tolist(), tour.pos.tolist()
+        n = len(order)
+        for i in range(n):
+            succ = (i + 1) % n
+            for b in self.neighbors[order[i]]:
+                if pos[b] != succ:
+                    yield succ, pos[b]
+
+    def delta(self, tour, move):
+        return swap_delta(tour.order, move[0], move[1], self.dist)
+
+    def apply(self, tour, move):
+        tour.swap(*move)
+
+
+class TwoOptMove(MoveOperator):
+    """Reverses tour[i+1:j+1], replacing edges (t_i, t_i+1), (t_j, t_j+1)."""
+
+    name = "2opt"
+
+    @staticmethod
+    def _normalize(i, j, n):
+        if i > j:
+            i, j = j, i
+        if j - i < 2 or (i == 0 and j == n - 1):
+            return None
+        return i, j
+
+    def random_move(self, tour):
+        n = len(tour)
+        i = random.randrange(n)
+        return self._normalize(i, tour.pos[random.choice(self.neighbors[tour.order[i]])], n)
+
+    def candidates(self, tour):
+        d, n = self.dist, len(tour)
+        order, pos = tour.order.tolist(), tour.pos.tolist()
+        for i in range(n):
+            a = order[i]
+            d_succ = d[a, order[(i + 1) % n]]
+            for b in self.neighbors[a]:
+                if d[a, b] >= d_succ:
+                    break
+                move = self._normalize(i, pos[b], n)
+                if move is not None:
+                    yield move
+
+    def delta(self, tour, move):
+        d, n = self.dist, len(tour)
+        order = tour.order
+        i, j = move
+        a, c = order[i], order[i + 1]
+        b, e = order[j], order[(j + 1) % n]
+        return d[a, b] + d[c, e] - d[a, c] - d[b, e]
+
+    def apply(self, tour, move):
+        i, j = move
+        tour.reverse(i + 1, j)
+
+
+class OrOptMove(MoveOperator):
+    """Moves a segment of 1-3 cities, optionally reversed, next to a neighbour.
+
+    Move (i, length, b, reverse) takes tour[i:i+length] out and reinserts it
+    between city b and its successor.
+    """
+
+    name = "oropt"
+    MAX_SEGMENT = 3
+
+    @staticmethod
+    def _valid(n, pos, i, length, b):
+        if i + length > n or n < length + 2:
+            return False
+        p = pos[b]
+        return not (i <= p < i + length) and p != (i - 1) % n
+
+    def random_move(self, tour):
+        n = len(tour)
+        length = random.randint(1, self.MAX_SEGMENT)
+        i = random.randrange(n)
+        b = random.choice(self.neighbors[tour.order[i]])
+        if not self._valid(n, tour.pos, i, length, b):
+            return None
+        return i, length, b, random.random() < 0.5
+
+    def candidates(self, tour):
+        n = len(tour)
+        order, pos = tour.order.tolist(), tour.pos.tolist()
+        for length in range(1, self.MAX_SEGMENT + 1):
+            for i in range(n - length + 1):
+                first, last = order[i], order[i + length - 1]
+                for end in (first,) if first == last else (first, last):
+                    for b in self.neighbors[end]:
+                        if self._valid(n, pos, i, length, b):
+                            yield i, length, b, False
+                            yield i, length, b, True
+
+    def delta(self, tour, move):
+        d, n = self.dist, len(tour)
+        order = tour.order
+        i, length, b, reverse = move
+        p, first, last, nxt = order[i - 1], order[i], order[i + length - 1], order[(i + length) % n]
+        c = tour.successor(b)
+        removed = d[p, first] + d[last, nxt] + d[b, c]
+        if reverse:
+            first, last = last, first
+        return d[p, nxt] + d[b, first] + d[last, c] - removed
+
+    def apply(self, tour, move):
+        i, length, b, reverse = move
+        tour.move_segment(i, length, tour.pos[b], reverse)
+
+
+class ThreeOptMove(MoveOperator):
+    """Pure 3-opt segment exchange: t[:i+1] + t[j+1:k+1] + t[i+1:j+1] + t[k+1:].
+
+    Move (i, j, k), i < j < k, replaces edges (t_i, t_i+1), (t_j, t_j+1) and
+    (t_k, t_k+1) without reversing anything, so it also suits tours whose
+    segments should keep their direction.
+    """
+
+    name = "3opt"
+
+    @staticmethod
+    def _valid(i, j, k):
+        return i < j < k
+
+    def random_move(self, tour):
+        n = len(tour)
+        order, pos = tour.order, tour.pos
+        i = random.randrange(n - 1)
+        j = pos[random.choice(self.neighbors[order[i]])] - 1
+        k = pos[random.choice(self.neighbors[order[i + 1]])]
+        return (i, j, k) if self._valid(i, j, k) else None
+
+    def candidates(self, tour):
+        d, n = self.dist, len(tour)
+        order, pos = tour.order.tolist(), tour.pos.tolist()
+        for i in range(n - 1):
+            a, a_next = order[i], order[i + 1]
+            d_removed = d[a, a_next]
+            for b in self.neighbors[a]:
+                # b becomes t_j+1, the successor of a
+                if d[a, b] >= d_removed:
+                    break
+                j = pos[b] - 1
+                if j <= i:
+                    continue
+                for c in self.neighbors[a_next]:
+                    k = pos[c]
+                    if k > j:
+                        yield i, j, k
+
+    def delta(self, tour, move):
+        d, n = self.dist, len(tour)
+        order = tour.order
+        i, j, k = move
+        a, a_next = order[i], order[i + 1]
+        b, b_next = order[j], order[j + 1]
+        c, c_next = order[k], order[(k + 1) % n]
+        return d[a, b_next] + d[c, a_next] + d[b, c_next] - d[a, a_next] - d[b, b_next] - d[c, c_next]
+
+    def apply(self, tour, move):
+        tour.exchange_segments(*move)
+
+
+MOVES = {
+    SwapMove.name: SwapMove,
+    TwoOptMove.name: TwoOptMove,
+    OrOptMove.name: OrOptMove,
+    ThreeOptMove.name: ThreeOptMove,
+}
+
+
+def make_move(name, dist_matrix, k=10, index=None):
+    """Builds the registered move operator `name` with k-nearest candidate lists."""
+    if name not in MOVES:
+        raise ValueError(f"Unknown move '{name}', expected one of {sorted(MOVES)}")
+    return MOVES[name](dist_matrix, nearest_neighbors(dist_matrix, k, index))
@@ -0,0 +1,139 @@
+import multiprocessing
+import os
+import random
+import time
+import numpy as np
+from bounds import held_karp_bound
+from multiprocessing import shared_memory
+from Problem import LazyDistanceMatrix
+
+
+class SharedProblem:
+    """Picklable view of a ProblemInstance whose matrix lives in shared memory.
+
+    The parent copies dist_matrix into one SharedMemory block; pickling only
+    sends the block's name, so every worker maps the same pages instead of
+    receiving its own copy. A `LazyDistanceMatrix` is never materialised:
+    workers get its coordinates and compute distances themselves. Carries
+    the attributes the solvers read. With `bound` the Held-Karp lower bound
+    is computed here, once, and shipped to the workers with the rest.
+    """
+
+    def __init__(self, problem, bound=False):
+        self.name = problem.name
+        self.nPoints = problem.nPoints
+        self.best_sol = problem.best_sol
+        self.edge_weight_type = problem.edge_weight_type
+        self.points = problem.points
+        self.bound = problem.lower_bound() if bound else problem.bound
+        self.spatial_index = problem.spatial_index
+        self._owner = True
+        if isinstance(problem.dist_matrix, LazyDistanceMatrix):
+            self._shm = None
+            self.dist_matrix = problem.dist_matrix
+            return
+        matrix = np.asarray(problem.dist_matrix)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+        self._shape, self._dtype = matrix.shape, matrix.dtype.str
+        self.dist_matrix = np.ndarray(self._shape, dtype=self._dtype, buffer=self._shm.buf)
+        self.dist_matrix[:] = matrix
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._shm is None:
+            # the coordinates, without the parent's cached rows
+            lazy = self.dist_matrix
+            state["dist_matrix"] = LazyDistanceMatrix(lazy.coords, lazy.dtype, lazy.cache_rows, lazy.metric)
+            return state
+        state["_shm"] = self._shm.name
+        del state["dist_matrix"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._owner = False
+        if self._shm is None:
+            return
+        self._shm = shared_memory.SharedMemory(name=state["_shm"])
+        self.dist_matrix = np.ndarray(self._shape, dtype=self._dtype, buffer=self._shm.buf)
+        self.dist_matrix.flags.writeable = False
+
+    def lower_bound(self, **kwargs):
+        if self.bound is None:
+            self.bound = held_karp_bound(self.dist_matrix, **kwargs)
+        return self.bound
+
+    def close(self):
+        """Releases the mapping; the creating process also frees the block."""
+        self.dist_matrix = None
+        if self._shm is None:
+            return
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+_worker_problem = None
+
+
+def _init_worker(problem):
+    global _worker_problem
+    _worker_problem = problem
+
+
+def _run(task):
+    solver, run_id, seed, solver_kwargs = task
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+    start = time.perf_counter()
+    tour, length, convergence = solver(_worker_problem, **solver_kwargs)
+    return {
+        "run": run_id,
+        "seed": seed,
+        "tour": list(tour),
+        "length": length,
+        "time": time.perf_counter() - start,
+        "convergence_point": convergence[-1],
+    }
+
+
+def multistart(solver, problem, runs, seeds=None, workers=None, timeout=None, **solver_kwargs):
+    """Runs `solver(problem, **solver_kwargs)` `runs` times across processes.
+
+    `solver` must be a module-level function such as hill_climb. Run i is
+    seeded with seeds[i] (random ones by default, reported back so any run
+    can be replayed). Yields one result dict per run in completion order;
+    `timeout` bounds the whole batch: when it is exceeded the workers still
+    running are terminated and TimeoutError is raised.
+    """
+    if runs == 0:
+        return
+    if seeds is None:
+        seeds = [random.SystemRandom().randrange(2 ** 63) for _ in range(runs)]
+    workers = workers or os.cpu_count() or 1
+    # target_gap measures against the lower bound when there is no best known length
+    shared = SharedProblem(problem, bound=solver_kwargs.get("target_gap") is not None
+                           and problem.best_sol is None)
+    pool = multiprocessing.Pool(min(workers, runs), initializer=_init_worker, initargs=(shared,))
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        results = pool.imap_unordered(_run, [(solver, run_id, seeds[run_id - 1], solver_kwargs)
+                                             for run_id in range(1, runs + 1)])
+        for _ in range(runs):
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                result = results.next(remaining)
+            except multiprocessing.TimeoutError:
+                raise TimeoutError(f"{runs} runs did not finish within {timeout} s") from None
+            yield result
+    finally:
+        # every result is in unless the batch timed out or the caller stopped
+        # early; either way the workers left are not needed
+        pool.terminate()
+        pool.join()
+        shared.close()
+
+
+def best_result(results):
+    """The shortest-tour result of an iterable of `multistart` results."""
+    return min(results, key=lambda result: result["length"], default=None)
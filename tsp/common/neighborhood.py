@@ -0,0 +1,132 @@
+import numpy as np
+
+# entries per evaluated block; keeps the n x n delta arrays bounded on big instances
+BLOCK_SIZE = 1 << 22
+
+
+def _move_grid(tour, rows):
+    tour = np.asarray(tour)
+    n = len(tour)
+    i = np.arange(n)[rows if rows is not None else slice(None)][:, None]
+    j = np.arange(n)[None, :]
+    return tour, n, i, j
+
+
+def swap_deltas(tour, dist_matrix, rows=None):
+    """Length change of swapping tour positions i < j, for every pair at once.
+
+    Row r of the result belongs to i = arange(n)[rows][r]; entries with
+    j <= i are inf so argmin only ever picks valid moves.
+    """
+    tour, n, i, j = _move_grid(tour, rows)
+    deltas = np.full((i.shape[0], n), np.inf)
+    if n < 3:
+        return deltas
+    d = dist_matrix
+    ti, pi, ni = tour[i], tour[i - 1], tour[(i + 1) % n]
+    tj, pj, nj = tour[j], tour[j - 1], tour[(j + 1) % n]
+
+    added = d[pi, tj] + d[tj, ni] + d[pj, ti] + d[ti, nj]
+    removed = d[pi, ti] + d[ti, ni] + d[pj, tj] + d[tj, nj]
+    moves = added - removed
+    # j right after i: the edge between them is reversed, not replaced
+    adjacent = (d[pi, tj] + d[tj, ti] + d[ti, nj]) - (d[pi, ti] + d[ti, tj] + d[tj, nj])
+    moves = np.where(j == i + 1, adjacent, moves)
+
+    valid = j > i
+    deltas[valid] = moves[valid]
+    # (0, n - 1) are neighbours across the closing edge
+    wrap = np.flatnonzero(i[:, 0] == 0)
+    if wrap.size:
+        p, q, b, c = tour[n - 2], tour[n - 1], tour[0], tour[1]
+        deltas[wrap[0], n - 1] = (d[p, b] + d[b, q] + d[q, c]) - (d[p, q] + d[q, b] + d[b, c])
+    return deltas
+
+
+def two_opt_deltas(tour, dist_matrix, rows=None):
+    """Length change of every 2-opt move (i, j) on a symmetric instance.
+
+    Move (i, j) drops edges (tour[i], tour[i+1]) and (tour[j], tour[j+1]) and
+    reverses tour[i+1:j+1]. Degenerate pairs (shared node) are inf.
+    """
+    tour, n, i, j = _move_grid(tour, rows)
+    deltas = np.full((i.shape[0], n), np.inf)
+    if n < 4:
+        return deltas
+    d = dist_matrix
+    ti, ni = tour[i], tour[(i + 1) % n]
+    tj, nj = tour[j], tour[(j + 1) % n]
+    moves = (d[ti, tj] + d[ni, nj]) - (d[ti, ni] + d[tj, nj])
+
+    valid = (j >= i + 2) & ~((i == 0) & (j == n - 1))
+    deltas[valid] = moves[valid]
+    return deltas
+
+
+def improving_mask(deltas, tol=1e-9):
+    """Boolean mask of moves that shorten the tour by more than `tol`."""
+    return deltas < -tol
+
+
+def best_move(deltas, row_offset=0):
+    """(i, j, delta) of the smallest entry, first in row-major order; None if all inf."""
+    flat = int(np.argmin(deltas))
+    r, j = divmod(flat, deltas.shape[1])
+    delta = deltas[r, j]
+    if not np.isfinite(delta):
+        return None
+    return r + row_offset, j, float(delta)
+
+
+DELTA_FUNCTIONS = {
+    "swap": swap_deltas,
+    "2opt": two_opt_deltas,
+}
+
+
+def row_blocks(n, block_size=BLOCK_SIZE):
+    """Slices over 0..n-1 whose move blocks stay under `block_size` entries."""
+    step = max(1, block_size // max(n, 1))
+    for start in range(0, n, step):
+        yield slice(start, min(start + step, n))
+
+
+def best_improvement(tour, dist_matrix, move="swap", block_size=BLOCK_SIZE):
+    """Best (i, j, delta) over the whole neighbourhood, evaluated block by block."""
+    deltas_of = DELTA_FUNCTIONS[move]
+    best = None
+    for rows in row_blocks(len(tour), block_size):
+        candidate = best_move(deltas_of(tour, dist_matrix, rows), rows.start)
+        if candidate is not None and (best is None or candidate[2] < best[2]):
+            best = candidate
+    return best
+
+
+def swap_delta(tour, i, j, dist_matrix):
+    """Length change of swapping positions i and j, from the touched edges only."""
+    n = len(tour)
+    if i == j:
+        return 0.0
+
+    def node_after(p):
+        if p == i:
+            return tour[j]
+        if p == j:
+            return tour[i]
+        return tour[p]
+
+    delta = 0.0
+    for k in {(i - 1) % n, i, (j - 1) % n, j}:
+        k_next = (k + 1) % n
+        delta += dist_matrix[node_after(k), node_after(k_next)] - dist_matrix[tour[k], tour[k_next]]
+    return delta
+
+
+def apply_swap(tour, i, j):
+    tour[i], tour[j] = tour[j], tour[i]
+    return tour
+
+
+def apply_two_opt(tour, i, j):
+    tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1]
+    return tour
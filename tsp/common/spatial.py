@@ -0,0 +1,202 @@
+import numpy as np
+from neighborhood import BLOCK_SIZE
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# metrics that grow with the Euclidean distance of the coordinates, so an
+# index over the raw coordinates ranks cities the same way as the metric
+PLANAR_TYPES = ("EUC_2D", "CEIL_2D", "ATT")
+
+
+class UniformGrid:
+    """Bucket grid over 2-D points with k-nearest and radius queries.
+
+    About `per_cell` points per cell, so a query on evenly spread points only
+    looks at a few cells around it. Points can be removed, which
+    nearest-neighbour construction uses to skip visited cities.
+    """
+
+    def __init__(self, coords, per_cell=2):
+        self.coords = np.ascontiguousarray(coords, dtype=float)
+        n = len(self.coords)
+        self.side = max(1, int(np.ceil(np.sqrt(n / per_cell))))
+        self.low = self.coords.min(axis=0) if n else np.zeros(2)
+        span = np.ptp(self.coords, axis=0).max() if n else 0.0
+        self.cell = max(span / self.side, 1e-12)
+        self.cells = self._cell(self.coords)
+        self.buckets = [set() for _ in range(self.side * self.side)]
+        for point, (i, j) in enumerate(self.cells.tolist()):
+            self.buckets[i * self.side + j].add(point)
+        self.alive = np.ones(n, dtype=bool)
+        self.remaining = n
+
+    def __len__(self):
+        return self.remaining
+
+    def _cell(self, points):
+        cells = ((np.asarray(points, dtype=float) - self.low) / self.cell).astype(np.int64)
+        return np.clip(cells, 0, self.side - 1)
+
+    def remove(self, point):
+        if self.alive[point]:
+            i, j = self.cells[point]
+            self.buckets[i * self.side + j].discard(point)
+            self.alive[point] = False
+            self.remaining -= 1
+
+    def _ring(self, ci, cj, r):
+        found = []
+        for i in range(max(ci - r, 0), min(ci + r, self.side - 1) + 1):
+            if abs(i - ci) == r:
+                for j in range(max(cj - r, 0), min(cj + r, self.side - 1) + 1):
+                    found.extend(self.buckets[i * self.side + j])
+            else:
+                for j in (cj - r, cj + r):
+                    if 0 <= j < self.side:
+                        found.extend(self.buckets[i * self.side + j])
+        return found
+
+    def query(self, point, k=1, exclude=None):
+        """(distances, indices) of the k points closest to `point`, nearest first."""
+        point = np.asarray(point, dtype=float)
+        available = self.remaining - (exclude is not None and bool(self.alive[exclude]))
+        k = min(k, available)
+        if k <= 0:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        ci, cj = self._cell(point)
+        found = []
+        for r in range(self.side + 1):
+            if (2 * r + 1) ** 2 > 4 * self.remaining:
+                # few points left: a flat scan beats walking empty cells
+                found = np.flatnonzero(self.alive)
+                break
+            found.extend(self._ring(ci, cj, r))
+            if len(found) > k:
+                candidates = np.asarray(found)
+                if exclude is not None:
+                    candidates = candidates[candidates != exclude]
+                if len(candidates) >= k:
+                    d2 = ((self.coords[candidates] - point) ** 2).sum(axis=1)
+                    # every point beyond ring r is at least r cells away
+                    if np.partition(d2, k - 1)[k - 1] <= (r * self.cell) ** 2:
+                        break
+        found = np.asarray(found, dtype=np.int64)
+        if exclude is not None:
+            found = found[found != exclude]
+        d2 = ((self.coords[found] - point) ** 2).sum(axis=1)
+        nearest = np.argsort(d2, kind="stable")[:k]
+        return np.sqrt(d2[nearest]), found[nearest]
+
+    def query_radius(self, point, radius):
+        """Indices of the points within `radius` of `point`."""
+        point = np.asarray(point, dtype=float)
+        ci, cj = self._cell(point)
+        reach = int(np.ceil(radius / self.cell)) + 1
+        found = []
+        for r in range(min(reach, self.side) + 1):
+            found.extend(self._ring(ci, cj, r))
+        found = np.asarray(found, dtype=np.int64)
+        d2 = ((self.coords[found] - point) ** 2).sum(axis=1)
+        return np.sort(found[d2 <= radius * radius])
+
+    def knn_all(self, k):
+        """(n, k) array of every point's k nearest other points, closest first.
+
+        Vectorized over a coarser grid of about k points per cell: each point
+        checks its 3 x 3 cell window at once, which is exact whenever its k-th
+        neighbour lies within one cell width; the rest fall back to `query`.
+        """
+        n = len(self.coords)
+        k = max(0, min(k, n - 1))
+        result = np.empty((n, k), dtype=np.int64)
+        if k == 0:
+            return result
+        side = max(1, int(np.ceil(np.sqrt(n / k))))
+        cell = max(np.ptp(self.coords, axis=0).max() / side, 1e-12)
+        cells = np.clip(((self.coords - self.low) / cell).astype(np.int64), 0, side - 1)
+        keys = cells[:, 0] * side + cells[:, 1]
+
+        # points of each cell, padded with -1; row side*side stays empty for
+        # window cells that fall outside the grid
+        order = np.argsort(keys, kind="stable")
+        counts = np.bincount(keys, minlength=side * side)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        width = int(counts.max())
+        members = np.full((side * side + 1, width), -1, dtype=np.int64)
+        members[keys[order], np.arange(n) - starts[keys[order]]] = order
+
+        offsets = np.array([(di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1)])
+        step = max(1, BLOCK_SIZE // (9 * width))
+        unresolved = []
+        for begin in range(0, n, step):
+            rows = np.arange(begin, min(begin + step, n))
+            window = cells[rows, None, :] + offsets[None, :, :]
+            inside = ((window >= 0) & (window < side)).all(axis=2)
+            window_keys = np.where(inside, window[..., 0] * side + window[..., 1], side * side)
+            candidates = members[window_keys].reshape(len(rows), -1)
+            d2 = ((self.coords[candidates] - self.coords[rows, None, :]) ** 2).sum(axis=2)
+            d2[(candidates < 0) | (candidates == rows[:, None])] = np.inf
+            if d2.shape[1] < k:
+                unresolved.extend(rows.tolist())
+                continue
+            nearest = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            nearest_d2 = np.take_along_axis(d2, nearest, axis=1)
+            ranked = np.argsort(nearest_d2, axis=1, kind="stable")
+            result[rows] = np.take_along_axis(np.take_along_axis(candidates, nearest, axis=1), ranked, axis=1)
+            exact = np.take_along_axis(nearest_d2, ranked, axis=1)[:, -1] <= cell * cell
+            unresolved.extend(rows[~exact].tolist())
+        for point in unresolved:
+            result[point] = self.query(self.coords[point], k, exclude=point)[1]
+        return result
+
+
+class KDTreeIndex:
+    """scipy's cKDTree behind the same interface as `UniformGrid` (no removal)."""
+
+    def __init__(self, coords):
+        self.coords = np.ascontiguousarray(coords, dtype=float)
+        self.tree = cKDTree(self.coords)
+
+    def __len__(self):
+        return len(self.coords)
+
+    def query(self, point, k=1, exclude=None):
+        k = min(k + (exclude is not None), len(self.coords))
+        distances, indices = self.tree.query(point, k=max(k, 1))
+        distances, indices = np.atleast_1d(distances), np.atleast_1d(indices)
+        if exclude is not None:
+            keep = indices != exclude
+            distances, indices = distances[keep][:k - 1], indices[keep][:k - 1]
+        return distances, indices.astype(np.int64)
+
+    def query_radius(self, point, radius):
+        return np.sort(np.asarray(self.tree.query_ball_point(point, radius), dtype=np.int64))
+
+    def knn_all(self, k):
+        n = len(self.coords)
+        k = max(0, min(k, n - 1))
+        if k == 0:
+            return np.empty((n, 0), dtype=np.int64)
+        _, indices = self.tree.query(self.coords, k=k + 1)
+        indices = indices.reshape(n, k + 1)
+        # drop each point itself; with duplicates it may not come first
+        keep = indices != np.arange(n)[:, None]
+        keep[keep.all(axis=1), -1] = False
+        return indices[keep].reshape(n, k).astype(np.int64)
+
+
+def make_spatial_index(coords, kind=None):
+    """A KD-tree when scipy is installed, else a uniform grid; `kind` forces
+    "kdtree" or "grid"."""
+    if kind is None:
+        kind = "kdtree" if cKDTree is not None else "grid"
+    if kind == "kdtree":
+        if cKDTree is None:
+            raise ImportError("the kdtree spatial index needs scipy")
+        return KDTreeIndex(coords)
+    if kind == "grid":
+        return UniformGrid(coords)
+    raise ValueError(f"Unknown spatial index '{kind}', expected 'kdtree' or 'grid'")
@@ -0,0 +1,100 @@
+import random
+import numpy as np
+
+
+class Tour:
+    """A closed tour stored as an int32 city order plus its inverse.
+
+    `order[p]` is the city visited at position p and `pos[c]` the position of
+    city c. Every mutator updates both in place, touching only the positions
+    it moves.
+    """
+
+    def __init__(self, order):
+        self.order = np.array(order, dtype=np.int32)
+        n = len(self.order)
+        self.pos = np.full(n, -1, dtype=np.int32)
+        inside = (self.order >= 0) & (self.order < n)
+        self.pos[self.order[inside]] = np.flatnonzero(inside)
+
+    @classmethod
+    def random(cls, n):
+        """A uniformly shuffled tour, drawn with `random.shuffle` like the solvers always did."""
+        order = list(range(n))
+        random.shuffle(order)
+        return cls(order)
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, p):
+        return self.order[p]
+
+    def __iter__(self):
+        return iter(self.order.tolist())
+
+    def copy(self):
+        other = Tour.__new__(Tour)
+        other.order = self.order.copy()
+        other.pos = self.pos.copy()
+        return other
+
+    def tolist(self):
+        return self.order.tolist()
+
+    def successor(self, city):
+        return self.order[(self.pos[city] + 1) % len(self.order)]
+
+    def predecessor(self, city):
+        return self.order[self.pos[city] - 1]
+
+    def length(self, dist_matrix):
+        return float(dist_matrix[self.order, np.roll(self.order, -1)].sum())
+
+    def validate(self, n=None):
+        """True if the tour visits each of the n cities exactly once."""
+        size = len(self.order)
+        if n is not None and size != n:
+            return False
+        return size > 0 and bool((self.pos >= 0).all()) \
+            and bool(np.array_equal(self.order[self.pos], np.arange(size)))
+
+    def swap(self, i, j):
+        """Exchanges the cities at positions i and j."""
+        order, pos = self.order, self.pos
+        order[i], order[j] = order[j], order[i]
+        pos[order[i]], pos[order[j]] = i, j
+
+    def reverse(self, i, j):
+        """Reverses positions i..j inclusive (i <= j, no wrap-around)."""
+        if j <= i:
+            return
+        order = self.order
+        order[i:j + 1] = order[i:j + 1][::-1]
+        self.pos[order[i:j + 1]] = np.arange(i, j + 1, dtype=np.int32)
+
+    def move_segment(self, i, length, after, reverse=False):
+        """Moves positions i..i+length-1 to just after position `after`.
+
+        Done as block rotations by reversal, so only the cities between the
+        segment and its destination move.
+        """
+        end = i + length - 1
+        if after > end:
+            self.reverse(i, end)
+            self.reverse(end + 1, after)
+            self.reverse(i, after)
+            start = after - length + 1
+        else:
+            self.reverse(after + 1, i - 1)
+            self.reverse(i, end)
+            self.reverse(after + 1, end)
+            start = after + 1
+        if reverse:
+            self.reverse(start, start + length - 1)
+
+    def exchange_segments(self, i, j, k):
+        """Turns t[i+1..j], t[j+1..k] into t[j+1..k], t[i+1..j] (i < j < k)."""
+        self.reverse(i + 1, j)
+        self.reverse(j + 1, k)
+        self.reverse(i + 1, k)
@@ -0,0 +1,179 @@
+import re
+import numpy as np
+
+# next keyword line ends a numeric data section
+_KEYWORD_LINE = re.compile(r"^\s*[A-Za-z]")
+# data lines parsed per np.fromstring call
+SECTION_CHUNK = 1 << 16
+
+GEO_RADIUS = 6378.388
+GEO_PI = 3.141592
+
+
+def euc_2d(coords_i, coords_j):
+    """TSPLIB EUC_2D distance, nint(sqrt(dx^2 + dy^2)), broadcast over coordinate arrays."""
+    return np.floor(_euclidean(coords_i, coords_j) + 0.5)
+
+
+def ceil_2d(coords_i, coords_j):
+    return np.ceil(_euclidean(coords_i, coords_j))
+
+
+def att(coords_i, coords_j):
+    """TSPLIB pseudo-Euclidean ATT distance."""
+    r = _euclidean(coords_i, coords_j) / np.sqrt(10.0)
+    t = np.floor(r + 0.5)
+    return np.where(t < r, t + 1, t)
+
+
+def geo(coords_i, coords_j):
+    """TSPLIB GEO distance; coordinates are DDD.MM latitude/longitude."""
+    lat_i, lon_i = _geo_radians(coords_i)
+    lat_j, lon_j = _geo_radians(coords_j)
+    q1 = np.cos(lon_i - lon_j)
+    q2 = np.cos(lat_i - lat_j)
+    q3 = np.cos(lat_i + lat_j)
+    cos_angle = np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)
+    return np.floor(GEO_RADIUS * np.arccos(cos_angle) + 1.0)
+
+
+def _euclidean(coords_i, coords_j):
+    diff = np.asarray(coords_i, dtype=float) - np.asarray(coords_j, dtype=float)
+    return np.sqrt((diff ** 2).sum(axis=-1))
+
+
+def _geo_radians(coords):
+    coords = np.asarray(coords, dtype=float)
+    degrees = np.trunc(coords)
+    radians = GEO_PI * (degrees + 5.0 * (coords - degrees) / 3.0) / 180.0
+    return radians[..., 0], radians[..., 1]
+
+
+METRICS = {
+    "EUC_2D": euc_2d,
+    "CEIL_2D": ceil_2d,
+    "ATT": att,
+    "GEO": geo,
+}
+
+# EDGE_WEIGHT_FORMAT -> (triangle, diagonal included) as filled row by row;
+# the *_COL formats of a symmetric matrix are the opposite triangle's *_ROW.
+_TRIANGLES = {
+    "UPPER_ROW": ("upper", False),
+    "LOWER_ROW": ("lower", False),
+    "UPPER_DIAG_ROW": ("upper", True),
+    "LOWER_DIAG_ROW": ("lower", True),
+    "UPPER_COL": ("lower", False),
+    "LOWER_COL": ("upper", False),
+    "UPPER_DIAG_COL": ("lower", True),
+    "LOWER_DIAG_COL": ("upper", True),
+}
+
+
+class TSPLibInstance:
+    """Header keywords plus the data sections of a TSPLIB file."""
+
+    def __init__(self, header, coords, node_ids, weights):
+        self.header = header
+        self.name = header.get("NAME")
+        self.dimension = int(header["DIMENSION"])
+        self.edge_weight_type = header.get("EDGE_WEIGHT_TYPE", "EUC_2D")
+        self.best_known = float(header["BEST_KNOWN"]) if "BEST_KNOWN" in header else None
+        self.coords = coords
+        self.node_ids = node_ids
+        self.weights = weights
+
+    @property
+    def metric(self):
+        """Vectorized distance function for coordinate instances, None if EXPLICIT."""
+        if self.edge_weight_type == "EXPLICIT":
+            return None
+        if self.edge_weight_type not in METRICS:
+            raise ValueError(f"Unsupported EDGE_WEIGHT_TYPE '{self.edge_weight_type}'")
+        return METRICS[self.edge_weight_type]
+
+    @property
+    def points(self):
+        """(n, 3) array of node id, x, y, the layout the plotting code expects."""
+        points = np.zeros((self.dimension, 3))
+        points[:, 0] = self.node_ids if self.node_ids is not None else np.arange(1, self.dimension + 1)
+        if self.coords is not None:
+            points[:, 1:3] = self.coords[:, :2]
+        return points
+
+
+def read_tsplib(path):
+    """Parses a TSPLIB file: keywords in any order, data sections streamed."""
+    header = {}
+    sections = {}
+    with open(path) as f:
+        line = f.readline()
+        while line:
+            line = line.strip()
+            if line == "EOF":
+                break
+            keyword, sep, value = line.partition(":")
+            keyword = keyword.strip().upper()
+            line = f.readline()
+            if sep:
+                header[keyword] = value.strip()
+            elif keyword.endswith("_SECTION"):
+                sections[keyword], line = _read_section(f, line)
+            # other bare keywords carry no data we use
+
+    if "DIMENSION" not in header:
+        raise ValueError(f"{path}: missing DIMENSION")
+    n = int(header["DIMENSION"])
+
+    coords = node_ids = weights = None
+    for name in ("NODE_COORD_SECTION", "DISPLAY_DATA_SECTION"):
+        if name in sections:
+            table = sections[name].reshape(n, -1)
+            node_ids, coords = table[:, 0].astype(int), table[:, 1:]
+            break
+    if header.get("EDGE_WEIGHT_TYPE") == "EXPLICIT":
+        weights = _explicit_matrix(sections.get("EDGE_WEIGHT_SECTION"),
+                                   header.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX"), n)
+    elif coords is None:
+        raise ValueError(f"{path}: no NODE_COORD_SECTION")
+    return TSPLibInstance(header, coords, node_ids, weights)
+
+
+def _read_section(f, line):
+    """Numbers from `line` up to the next keyword line, parsed a chunk of lines
+    at a time so the file text is never held whole; returns them and that
+    keyword line ("" at the end of the file)."""
+    chunks, lines = [], []
+    while line and not _KEYWORD_LINE.match(line):
+        lines.append(line)
+        if len(lines) == SECTION_CHUNK:
+            chunks.append(np.fromstring("".join(lines), sep=" "))
+            lines = []
+        line = f.readline()
+    chunks.append(np.fromstring("".join(lines), sep=" "))
+    return np.concatenate(chunks), line
+
+
+def _explicit_matrix(values, weight_format, n):
+    if values is None:
+        raise ValueError("EXPLICIT instance without EDGE_WEIGHT_SECTION")
+    if weight_format == "FULL_MATRIX":
+        _check_count(values, n * n)
+        return values[:n * n].reshape(n, n)
+    if weight_format not in _TRIANGLES:
+        raise ValueError(f"Unsupported EDGE_WEIGHT_FORMAT '{weight_format}'")
+
+    triangle, diagonal = _TRIANGLES[weight_format]
+    offset = 0 if diagonal else 1
+    rows, cols = np.triu_indices(n, offset) if triangle == "upper" else np.tril_indices(n, -offset)
+    _check_count(values, len(rows))
+    matrix = np.zeros((n, n))
+    matrix[rows, cols] = values[:len(rows)]
+    matrix[cols, rows] = values[:len(rows)]
+    return matrix
+
+
+def _check_count(values, count):
+    # np.fromstring stops at the first token that is not a number
+    if len(values) < count:
+        raise ValueError(f"EDGE_WEIGHT_SECTION holds {len(values)} numbers, expected {count}")